@@ -1,66 +1,107 @@
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Dense
-from tensorflow.keras.losses import MeanSquaredError
+import os
 import numpy as np
 import pandas as pd
 from pathlib import Path
+from numpy_backend import NumpyModel, score_column
+from telemetry_log import LOG_DIR, read_log
 
 MODEL_FILE = Path("rnn_task_model.h5")
 DATA_FILE = Path("tasks_data.csv")
+# "numpy" serves the saved weights without importing TensorFlow, "keras" loads the full model
+SERVING_BACKEND = os.environ.get("SERVING_BACKEND", "numpy")
 
 class RNNModel:
-    def __init__(self):
+    def __init__(self, serving=SERVING_BACKEND):
+        self.serving = serving
         self.model = None
+        self.backend = None
         self.min_data_rows = 1000
         self.load_model()
 
     def load_model(self):
-        if MODEL_FILE.exists():
+        self.model = None
+        self.backend = None
+        if not MODEL_FILE.exists():
+            return
+        if self.serving == "numpy":
+            try:
+                self.backend = NumpyModel.from_h5(MODEL_FILE)
+            except Exception as e:
+                print(f"Failed to load model weights: {e}")
+            if self.backend is not None:
+                return
+        # Unsupported layers (or keras serving): fall back to the full Keras model
+        self.keras_model()
+
+    def keras_model(self):
+        # Training and keras serving need the Keras model; TensorFlow is imported on first use
+        if self.model is None and MODEL_FILE.exists():
+            from tensorflow.keras.models import load_model
+            from tensorflow.keras.losses import MeanSquaredError
             try:
                 self.model = load_model(MODEL_FILE, compile=False)
                 self.model.compile(optimizer="adam", loss=MeanSquaredError())
             except Exception as e:
                 print(f"Failed to load model: {e}")
                 self.model = None
-        else:
-            self.model = None
+        return self.model
 
     def preprocess(self, df):
+        df = df.dropna(subset=["CPU","RAM","total_score"])
         X = df[["CPU","RAM"]].values
         y = df["total_score"].values
         return X, y
 
     def train_from_csv(self, epochs=5):
-        if not DATA_FILE.exists():
+        # Legacy CSV history plus the telemetry log
+        frames = []
+        if DATA_FILE.exists():
+            frames.append(pd.read_csv(DATA_FILE))
+        if LOG_DIR.exists():
+            frames.append(read_log(LOG_DIR))
+        if not frames:
             return
-        df = pd.read_csv(DATA_FILE)
+        df = pd.concat(frames, ignore_index=True)
         if len(df) < self.min_data_rows:
             return
         X, y = self.preprocess(df)
-        self.model = Sequential()
-        self.model.add(Dense(32, input_dim=X.shape[1], activation="relu"))
-        self.model.add(Dense(16, activation="relu"))
-        self.model.add(Dense(1))
-        self.model.compile(optimizer="adam", loss=MeanSquaredError())
-        self.model.fit(X, y, epochs=epochs, verbose=0)
-        self.model.save(MODEL_FILE)
+        model = self.build_model(X.shape[1])
+        model.fit(X, y, epochs=epochs, verbose=0)
+        model.save(MODEL_FILE)
+        self.swap_model(model)
+
+    def build_model(self, input_dim=2):
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Dense
+        from tensorflow.keras.losses import MeanSquaredError
+
+        model = Sequential()
+        model.add(Dense(32, input_dim=input_dim, activation="relu"))
+        model.add(Dense(16, activation="relu"))
+        model.add(Dense(1))
+        model.compile(optimizer="adam", loss=MeanSquaredError())
+        return model
+
+    def swap_model(self, model):
+        # Backend first: a concurrent predict_batch sees either the old or the new weights
+        self.backend = NumpyModel.from_keras(model) if self.serving == "numpy" else None
+        self.model = model
 
     def predict(self, task):
-        if self.model is None or not MODEL_FILE.exists():
-            return np.random.uniform(10,80)
+        return float(self.predict_batch([task])[0])
 
-        X = np.array([[task["CPU"], task["RAM"]]])
-        pred = self.model.predict(X, verbose=0)
+    def predict_batch(self, tasks):
+        # Score all tasks in one forward pass
+        if self.model is None and self.backend is None:
+            return np.random.uniform(10,80, size=len(tasks))
+        if not tasks:
+            return np.zeros(0)
 
-        # Robust float extraction
+        X = np.array([[t["CPU"], t["RAM"]] for t in tasks], dtype=np.float32)
         try:
-            if isinstance(pred, np.ndarray):
-                return float(pred.item()) if pred.size == 1 else float(pred[0,0])
-            elif isinstance(pred, list):
-                return float(pred[0][0])
-            else:
-                return float(pred)
+            if self.backend is not None:
+                return score_column(self.backend.predict(X))
+            return score_column(self.model.predict(X, verbose=0))
         except Exception as e:
-            print("Predict conversion error:", e)
-            return np.random.uniform(10,80)
+            print("Predict error:", e)
+            return np.random.uniform(10,80, size=len(tasks))
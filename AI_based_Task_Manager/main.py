@@ -1,47 +1,84 @@
 import streamlit as st
-import pandas as pd
-import random
+import numpy as np
+import os
+import weakref
 from pathlib import Path
 from ai_model import RNNModel
 from streamlit_autorefresh import st_autorefresh
 from utils import calculate_total_score  # eski score hesaplama fonksiyonun
+from telemetry_log import get_log
+from trainer import IncrementalTrainer
+from sampler import get_sampler, top_processes
+from task_queue import TaskStore
 
 # -----------------------------
 st.set_page_config(page_title="⚡ AI Task Manager", layout="wide")
 st.title("⚡ AI Task Manager - AI Weighted Total Score Table + Inline Delete")
 
-DATA_FILE = Path("tasks_data.csv")
+EXPORT_FILE = Path("tasks_export.csv")
 
 # -----------------------------
 # Session state
 if "tasks" not in st.session_state:
-    st.session_state.tasks = []
+    st.session_state.tasks = TaskStore()
 
+# One serving model per process, fine-tuned in the background from the telemetry log
+@st.cache_resource
+def get_model_and_trainer():
+    model = RNNModel()
+    trainer = IncrementalTrainer(model).start()
+    return model, trainer
+
+shared_model, trainer = get_model_and_trainer()
 if "rnn_model" not in st.session_state:
-    st.session_state.rnn_model = RNNModel()
+    st.session_state.rnn_model = shared_model
 
 # -----------------------------
 # Auto-refresh every 3 seconds
 st_autorefresh(interval=3000, key="table_refresh")
 
 # -----------------------------
-# Append-only CSV log
+# Append-only telemetry log (buffered, flushed in batches by a background writer)
+telemetry = get_log()
+
 def log_task_change(task):
-    df = pd.DataFrame([task])
-    if DATA_FILE.exists():
-        df.to_csv(DATA_FILE, mode='a', header=False, index=False)
-    else:
-        df.to_csv(DATA_FILE, mode='w', header=True, index=False)
+    telemetry.append(task)
+
+def release_pids(sampler, pids):
+    for pid in list(pids):
+        sampler.untrack(pid)
+
+if st.sidebar.button("Export log to CSV"):
+    telemetry.export_csv(EXPORT_FILE)
+    st.sidebar.success(f"Exported to {EXPORT_FILE}")
+
+with st.sidebar.expander("🧠 Trainer status"):
+    status = trainer.status()
+    st.write(f"Lag: {status['lag_rows']} rows")
+    if status["lag_seconds"] is not None:
+        st.write(f"Last update: {status['lag_seconds']:.0f}s ago")
+    st.write(f"Rows trained: {status['rows_trained']}")
+    st.write(f"Throughput: {status['rows_per_sec']:.0f} rows/s")
+    if status["last_error"]:
+        st.error(status["last_error"])
 
 # -----------------------------
-# Initialize dummy tasks
+# Real CPU/RAM from /proc, sampled on a background thread
+sampler = get_sampler()
+if "tracked_pids" not in st.session_state:
+    # One sampler reference per distinct pid of this session, released when the session's store is collected
+    st.session_state.tracked_pids = set()
+    weakref.finalize(st.session_state.tasks, release_pids, sampler, st.session_state.tracked_pids)
+
+# -----------------------------
+# Initialize tasks from the largest running processes
 if not st.session_state.tasks:
-    dummy_tasks = ["Fix API", "Write Report", "Test Module", "Update Script", "Analyze Document"]
-    for desc in dummy_tasks:
-        st.session_state.tasks.append({
-            "desc": desc,
-            "CPU": random.randint(10,50),
-            "RAM": random.randint(50,300),
+    for pid, name in top_processes(5):
+        st.session_state.tasks.add({
+            "desc": name,
+            "pid": pid,
+            "CPU": 0.0,
+            "RAM": 0.0,
             "score": 0.0
         })
 
@@ -50,26 +87,43 @@ if not st.session_state.tasks:
 st.subheader("➕ Add Task")
 with st.form("add_task_form"):
     task_desc_input = st.text_input("Task Description")
+    task_pid_input = st.number_input("Process ID (0 = this app)", min_value=0, step=1)
     submit = st.form_submit_button("Add Task")
     if submit and task_desc_input:
         task_entry = {
             "desc": task_desc_input,
-            "CPU": random.randint(10,50),
-            "RAM": random.randint(50,500),
+            "pid": int(task_pid_input) or os.getpid(),
+            "CPU": 0.0,
+            "RAM": 0.0,
             "score": 0.0
         }
-        st.session_state.tasks.append(task_entry)
+        st.session_state.tasks.add(task_entry)
         log_task_change(task_entry)
         st.success(f"Task '{task_desc_input}' added.")
 
 # -----------------------------
 # Update CPU/RAM/Score and total_score
-for t in st.session_state.tasks:
-    t["CPU"] = random.randint(5,80)
-    t["RAM"] = random.randint(50,500)
-
-    # AI prediction
-    t["score"] = st.session_state.rnn_model.predict({"CPU": t["CPU"], "RAM": t["RAM"]})
+tasks = list(st.session_state.tasks)
+pids = {t["pid"] for t in tasks}
+tracked = st.session_state.tracked_pids
+for pid in pids - tracked:
+    sampler.track(pid)
+release_pids(sampler, tracked - pids)
+tracked.clear()
+tracked.update(pids)
+usage = sampler.smoothed([t["pid"] for t in tasks])
+for i, t in enumerate(tasks):
+    # Smoothed (EWMA) load; 0 until the first sample arrives
+    t["CPU"] = float(np.nan_to_num(usage["cpu_ewma"][i]))
+    t["RAM"] = float(np.nan_to_num(usage["rss_ewma"][i]))
+    t["CPU_p95"] = float(np.nan_to_num(usage["cpu_p95"][i]))
+    t["RAM_p95"] = float(np.nan_to_num(usage["rss_p95"][i]))
+
+# AI prediction for all tasks in one forward pass
+ai_scores = st.session_state.rnn_model.predict_batch(tasks)
+
+for t, ai_score in zip(tasks, ai_scores):
+    t["score"] = float(ai_score)
 
     # Eski score
     old_score = calculate_total_score(t)
@@ -77,20 +131,22 @@ for t in st.session_state.tasks:
     # Total score: %70 AI, %30 old_score
     t["total_score"] = t["score"]*0.7 + old_score*0.3
 
-    # Append-only CSV log
+    # Append-only log
     log_task_change(t)
 
 # -----------------------------
-# Sort by total_score
-tasks_sorted = sorted(st.session_state.tasks, key=lambda x: x["total_score"], reverse=True)
+# Re-prioritize by total_score and read only the top rows
+st.session_state.tasks.set_priorities((t["id"], t["total_score"]) for t in tasks)
+top_n = st.sidebar.number_input("Rows to show", min_value=1, value=50, step=10)
+tasks_sorted = st.session_state.tasks.top(int(top_n))
 
 # -----------------------------
 # Table header
 st.subheader("📋 Tasks Table")
 col_desc, col_cpu, col_ram, col_score, col_total, col_delete = st.columns([4,1,1,1,1,1])
 col_desc.markdown("**Task**")
-col_cpu.markdown("**CPU**")
-col_ram.markdown("**RAM**")
+col_cpu.markdown("**CPU %**")
+col_ram.markdown("**RAM MB**")
 col_score.markdown("**Score**")
 col_total.markdown("**Total Score**")
 col_delete.markdown("**Action**")
@@ -99,9 +155,10 @@ col_delete.markdown("**Action**")
 for t in tasks_sorted:
     col_desc, col_cpu, col_ram, col_score, col_total, col_delete = st.columns([4,1,1,1,1,1])
     col_desc.write(f"{t['desc']}")
-    col_cpu.write(f"{t['CPU']}")
-    col_ram.write(f"{t['RAM']}")
+    col_cpu.write(f"{t['CPU']:.1f}")
+    col_ram.write(f"{t['RAM']:.1f}")
     col_score.write(f"{t['score']:.2f}")
     col_total.write(f"{t['total_score']:.2f}")
-    if col_delete.button("Delete", key=f"del_{t['desc']}"):
-        st.session_state.tasks.remove(t)
+    if col_delete.button("Delete", key=f"del_{t['id']}"):
+        st.session_state.tasks.remove(t["id"])
+        st.rerun()
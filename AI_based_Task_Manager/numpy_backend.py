@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# The NumPy Keras runtime is shared with the other apps from the repository root
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from common.numpy_keras import NumpyModel
+
+def score_column(outputs):
+    """
+    Pick the single-unit (regression) output of a possibly multi-output prediction
+    """
+    if isinstance(outputs, (list, tuple)):
+        single = [o for o in outputs if np.asarray(o).shape[-1] == 1]
+        outputs = single[0] if single else outputs[0]
+    outputs = np.asarray(outputs, dtype=np.float64)
+    return outputs.reshape(len(outputs), -1)[:, 0]
@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_MB = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def read_proc_stat(pid):
+    """
+    Return (cpu ticks, rss MB) for a pid from /proc/<pid>/stat, or None if it is gone
+    """
+    try:
+        fd = os.open(f"/proc/{pid}/stat", os.O_RDONLY)
+        try:
+            data = os.read(fd, 1024)
+        finally:
+            os.close(fd)
+    except OSError:
+        return None
+    # The command name may contain spaces, so split after its closing ")"
+    fields = data[data.rfind(b")") + 2:].split()
+    # utime, stime and rss are fields 14, 15 and 24 of the stat line
+    return int(fields[11]) + int(fields[12]), int(fields[21]) * PAGE_MB
+
+def top_processes(n=5):
+    """
+    Return [(pid, name)] of the n processes with the largest RSS
+    """
+    procs = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        stat = read_proc_stat(entry)
+        if stat is None:
+            continue
+        try:
+            with open(f"/proc/{entry}/comm") as f:
+                name = f.read().strip()
+        except OSError:
+            continue
+        procs.append((stat[1], int(entry), name))
+    procs.sort(reverse=True)
+    return [(pid, name) for _, pid, name in procs[:n]]
+
+class ProcessSampler:
+    """
+    Background per-process CPU/RSS sampler reading /proc.
+
+    Every tracked pid owns a slot in preallocated ring buffers (capacity x
+    window), so sampling never allocates per sample; the buffers double when
+    full. Tracking is reference counted, so tasks from different sessions that
+    watch the same process share one slot. Readers get EWMA and p95 values. If a sampling pass costs more than max_overhead of the interval,
+    the interval is stretched to keep the sampler's own CPU use bounded.
+    """
+    def __init__(self, rate_hz=1.0, window=60, capacity=4096, alpha=0.3, max_overhead=0.01):
+        self.interval = 1.0 / rate_hz
+        self.window = window
+        self.capacity = capacity
+        self.alpha = alpha
+        self.max_overhead = max_overhead
+        self.cpu = np.full((capacity, window), np.nan, dtype=np.float32)
+        self.rss = np.full((capacity, window), np.nan, dtype=np.float32)
+        self.cpu_ewma = np.full(capacity, np.nan, dtype=np.float32)
+        self.rss_ewma = np.full(capacity, np.nan, dtype=np.float32)
+        self.pids = np.zeros(capacity, dtype=np.int64)
+        self.last_ticks = np.full(capacity, -1, dtype=np.int64)
+        self.pos = 0
+        self.slots = {}
+        self.refs = {}
+        self.free = list(range(capacity - 1, -1, -1))
+        self.effective_interval = self.interval
+        self.sample_seconds = 0.0
+        self.samples = 0
+        self._last_time = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def track(self, pid):
+        with self._lock:
+            if pid in self.slots:
+                self.refs[pid] += 1
+                return
+            if not self.free:
+                self._grow()
+            slot = self.free.pop()
+            self.slots[pid] = slot
+            self.refs[pid] = 1
+            self.pids[slot] = pid
+            self.cpu[slot] = np.nan
+            self.rss[slot] = np.nan
+            self.cpu_ewma[slot] = np.nan
+            self.rss_ewma[slot] = np.nan
+            self.last_ticks[slot] = -1
+
+    def untrack(self, pid):
+        with self._lock:
+            if pid not in self.slots:
+                return
+            self.refs[pid] -= 1
+            if self.refs[pid] == 0:
+                del self.refs[pid]
+                self.free.append(self.slots.pop(pid))
+
+    def _grow(self):
+        old = self.capacity
+        self.capacity *= 2
+        for name, fill in (("cpu", np.nan), ("rss", np.nan), ("cpu_ewma", np.nan),
+                           ("rss_ewma", np.nan), ("pids", 0), ("last_ticks", -1)):
+            column = getattr(self, name)
+            grown = np.full((self.capacity,) + column.shape[1:], fill, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self.free = list(range(self.capacity - 1, old - 1, -1))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="process-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            cost = self.sample()
+            # Keep sampler CPU below max_overhead by stretching the interval
+            self.effective_interval = max(self.interval, cost / self.max_overhead)
+            self._stop.wait(max(self.effective_interval - cost, 0))
+
+    def sample(self):
+        """
+        Take one sample of every tracked process; returns the CPU seconds it cost
+        """
+        started = time.thread_time()
+        now = time.monotonic()
+        with self._lock:
+            slots = np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))
+            pids = self.pids[slots]
+        ticks = np.full(len(slots), -1, dtype=np.int64)
+        rss = np.full(len(slots), np.nan, dtype=np.float32)
+        for i, pid in enumerate(pids):
+            stat = read_proc_stat(pid)
+            if stat is not None:
+                ticks[i], rss[i] = stat
+
+        with self._lock:
+            elapsed = now - self._last_time if self._last_time is not None else None
+            prev = self.last_ticks[slots]
+            cpu = np.full(len(slots), np.nan, dtype=np.float32)
+            if elapsed:
+                valid = (prev >= 0) & (ticks >= 0)
+                cpu[valid] = (ticks[valid] - prev[valid]) / CLK_TCK / elapsed * 100.0
+            self.last_ticks[slots] = ticks
+            self.cpu[slots, self.pos] = cpu
+            self.rss[slots, self.pos] = rss
+            self.cpu_ewma[slots] = _ewma(self.cpu_ewma[slots], cpu, self.alpha)
+            self.rss_ewma[slots] = _ewma(self.rss_ewma[slots], rss, self.alpha)
+            self.pos = (self.pos + 1) % self.window
+            self._last_time = now
+
+        cost = time.thread_time() - started
+        self.sample_seconds += cost
+        self.samples += 1
+        return cost
+
+    def smoothed(self, pids):
+        """
+        Return {"cpu_ewma", "cpu_p95", "rss_ewma", "rss_p95"} arrays for pids
+        (NaN for untracked pids or before the first sample)
+        """
+        with self._lock:
+            index = [self.slots.get(pid, -1) for pid in pids]
+            slots = np.array([s if s >= 0 else 0 for s in index], dtype=np.int64)
+            missing = np.array([s < 0 for s in index], dtype=bool)
+            cpu_window = self.cpu[slots]
+            rss_window = self.rss[slots]
+            result = {"cpu_ewma": self.cpu_ewma[slots].copy(), "rss_ewma": self.rss_ewma[slots].copy()}
+        result["cpu_p95"] = _p95(cpu_window)
+        result["rss_p95"] = _p95(rss_window)
+        for values in result.values():
+            values[missing] = np.nan
+        return result
+
+    def stats(self):
+        return {
+            "tracked": len(self.slots),
+            "capacity": self.capacity,
+            "samples": self.samples,
+            "interval": self.effective_interval,
+            "avg_sample_ms": 1000 * self.sample_seconds / self.samples if self.samples else 0.0,
+            "overhead": (self.sample_seconds / self.samples) / self.effective_interval if self.samples else 0.0,
+        }
+
+def _ewma(prev, new, alpha):
+    out = np.where(np.isnan(prev), new, alpha * new + (1 - alpha) * prev)
+    # Keep the previous value when a process could not be read
+    return np.where(np.isnan(new), prev, out).astype(np.float32)
+
+def _p95(window):
+    out = np.full(len(window), np.nan, dtype=np.float32)
+    has_data = ~np.isnan(window).all(axis=1)
+    if has_data.any():
+        out[has_data] = np.nanpercentile(window[has_data], 95, axis=1)
+    return out
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def get_sampler(**kwargs):
+    """
+    Process-wide sampler shared by the app and task_system
+    """
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = ProcessSampler(**kwargs).start()
+        return _sampler
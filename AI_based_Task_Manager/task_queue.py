@@ -0,0 +1,184 @@
+import heapq
+import itertools
+import operator
+
+import numpy as np
+
+class IndexedPriorityQueue:
+    """
+    Binary max-heap with a position index: O(log n) push, update and remove
+    by key, O(1) peek and O(k log k) top-k reads without sorting the whole heap.
+    The position index is rebuilt lazily after a bulk update, since top-k reads
+    do not need it.
+    """
+    def __init__(self):
+        self.heap = []
+        self.priority = {}
+        self.pos = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.priority
+
+    def _positions(self):
+        if self.pos is None:
+            self.pos = dict(zip(self.heap, range(len(self.heap))))
+        return self.pos
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.pos[heap[i]] = i
+        self.pos[heap[j]] = j
+
+    def _up(self, i):
+        heap, prio = self.heap, self.priority
+        while i > 0:
+            parent = (i - 1) // 2
+            if prio[heap[i]] <= prio[heap[parent]]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _down(self, i):
+        heap, prio = self.heap, self.priority
+        n = len(heap)
+        while True:
+            largest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and prio[heap[child]] > prio[heap[largest]]:
+                    largest = child
+            if largest == i:
+                break
+            self._swap(i, largest)
+            i = largest
+
+    def push(self, key, priority):
+        if key in self.priority:
+            self.update(key, priority)
+            return
+        self._positions()
+        self.priority[key] = priority
+        self.heap.append(key)
+        self.pos[key] = len(self.heap) - 1
+        self._up(len(self.heap) - 1)
+
+    def update(self, key, priority):
+        self._positions()
+        old = self.priority[key]
+        self.priority[key] = priority
+        if priority > old:
+            self._up(self.pos[key])
+        else:
+            self._down(self.pos[key])
+
+    def update_many(self, items):
+        """
+        Re-prioritize many keys at once. Only keys whose priority changed are
+        touched; when many change, the heap is rebuilt with an O(n) bottom-up
+        heapify (vectorized with NumPy) instead of sifting each key in O(log n).
+        """
+        items = dict(items)
+        changed = sum(map(operator.ne, map(self.priority.__getitem__, items), items.values()))
+        if changed * 8 < len(self.heap):
+            for key, priority in items.items():
+                if self.priority[key] != priority:
+                    self.update(key, priority)
+            return
+        self.priority.update(items)
+        heap = self.heap
+        order = _heap_order(np.fromiter(map(self.priority.__getitem__, heap), dtype=np.float64, count=len(heap)))
+        self.heap = [heap[i] for i in order.tolist()]
+        self.pos = None
+
+    def remove(self, key):
+        i = self._positions().pop(key)
+        del self.priority[key]
+        last = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.pos[last] = i
+            self._up(i)
+            self._down(self.pos[last])
+
+    def peek(self):
+        return self.heap[0] if self.heap else None
+
+    def top_k(self, k):
+        """
+        Return up to k keys by descending priority. Only the k best heap nodes
+        and their children are visited (O(k log k)), never the whole heap.
+        """
+        heap, prio = self.heap, self.priority
+        result = []
+        if not heap:
+            return result
+        counter = itertools.count()
+        frontier = [(-prio[heap[0]], next(counter), 0)]
+        while frontier and len(result) < k:
+            _, _, i = heapq.heappop(frontier)
+            result.append(heap[i])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (-prio[heap[child]], next(counter), child))
+        return result
+
+def _heap_order(priorities):
+    """
+    Permutation that arranges priorities into a max-heap, by bottom-up heapify.
+    Nodes of one level have disjoint subtrees, so a whole level sifts down at once.
+    """
+    p = priorities.copy()
+    n = len(p)
+    order = np.arange(n)
+    last = n // 2  # nodes from here on are leaves
+    for level in range(int(np.log2(last)) if last else -1, -1, -1):
+        i = np.arange(2 ** level - 1, min(2 ** (level + 1) - 1, last))
+        while len(i):
+            child = 2 * i + 1
+            right = child + 1 < n
+            child[right] += p[child[right] + 1] > p[child[right]]
+            swap = p[child] > p[i]
+            i, child = i[swap], child[swap]
+            p[i], p[child] = p[child], p[i]
+            order[i], order[child] = order[child], order[i]
+            i = child[child < last]
+    return order
+
+class TaskStore:
+    """
+    Tasks keyed by stable integer IDs, ordered by an indexed priority queue
+    """
+    def __init__(self):
+        self.tasks = {}
+        self.queue = IndexedPriorityQueue()
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks.values())
+
+    def add(self, task, priority=0.0):
+        task_id = self.next_id
+        self.next_id += 1
+        task["id"] = task_id
+        self.tasks[task_id] = task
+        self.queue.push(task_id, priority)
+        return task_id
+
+    def remove(self, task_id):
+        self.queue.remove(task_id)
+        return self.tasks.pop(task_id)
+
+    def set_priority(self, task_id, priority):
+        self.queue.update(task_id, priority)
+
+    def set_priorities(self, items):
+        self.queue.update_many(items)
+
+    def top(self, k):
+        return [self.tasks[task_id] for task_id in self.queue.top_k(k)]
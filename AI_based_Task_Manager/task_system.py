@@ -1,11 +1,361 @@
+import numpy as np
 import pandas as pd
 import random
 from pathlib import Path
+from telemetry_log import get_log
+from sampler import get_sampler
 
 TASKS_FILE = Path("tasks_data.csv")
 folders = ["System/Kernel", "User/Documents", "User/Projects", "User/Downloads"]
 
-tasks_store = []
+EMPTY, DELETED = -1, -2
+
+class StringPool:
+    """
+    Interned strings in one shared UTF-8 byte buffer. Each distinct string is
+    stored once and referred to by an int32 code (offset, length and
+    reference count live in parallel arrays), so a column of strings costs 4
+    bytes per row instead of a pointer plus a Python str per row. Codes of
+    released strings are reused, and the buffer is compacted once more than
+    half of it belongs to released strings.
+    """
+    def __init__(self, capacity=256, buffer_bytes=4096):
+        self.data = np.zeros(buffer_bytes, dtype=np.uint8)
+        self.used = 0
+        self.dead = 0
+        self.offset = np.zeros(capacity, dtype=np.int64)
+        self.length = np.zeros(capacity, dtype=np.int32)
+        self.refs = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+        self.free = []
+        self.table = np.full(2 * capacity, EMPTY, dtype=np.int32)
+        self.table_used = 0
+
+    def __len__(self):
+        return self.count - len(self.free)
+
+    def _slot(self, encoded, h):
+        mask = len(self.table) - 1
+        i = h & mask
+        free = -1
+        while True:
+            code = int(self.table[i])
+            if code == EMPTY:
+                return (free if free >= 0 else i), -1
+            if code == DELETED:
+                if free < 0:
+                    free = i
+            elif self._bytes(code) == encoded:
+                return i, code
+            i = (i + 1) & mask
+
+    def _bytes(self, code):
+        start = self.offset[code]
+        return self.data[start:start + self.length[code]].tobytes()
+
+    def find(self, value):
+        """
+        Code of value, or -1 if it is not in the pool
+        """
+        encoded = value.encode("utf-8")
+        return self._slot(encoded, hash(encoded))[1]
+
+    def intern(self, value):
+        """
+        Code of value, adding it if needed; every call takes one reference
+        """
+        encoded = value.encode("utf-8")
+        h = hash(encoded)
+        slot, code = self._slot(encoded, h)
+        if code < 0:
+            if (self.table_used + 1) * 10 > len(self.table) * 6:
+                self._rehash()
+                slot, _ = self._slot(encoded, h)
+            code = self._new_code()
+            if self.used + len(encoded) > len(self.data):
+                self._reserve(len(encoded))
+            self.data[self.used:self.used + len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+            self.offset[code] = self.used
+            self.length[code] = len(encoded)
+            self.used += len(encoded)
+            if self.table[slot] == EMPTY:
+                self.table_used += 1
+            self.table[slot] = code
+        self.refs[code] += 1
+        return code
+
+    def release(self, code):
+        self.refs[code] -= 1
+        if self.refs[code]:
+            return
+        encoded = self._bytes(code)
+        slot, _ = self._slot(encoded, hash(encoded))
+        self.table[slot] = DELETED
+        self.dead += int(self.length[code])
+        self.free.append(code)
+        if self.dead * 2 > self.used:
+            self._compact()
+
+    def get(self, code):
+        return self._bytes(code).decode("utf-8")
+
+    def _new_code(self):
+        if self.free:
+            return self.free.pop()
+        if self.count == len(self.offset):
+            for name in ("offset", "length", "refs"):
+                old = getattr(self, name)
+                new = np.zeros(2 * len(old), dtype=old.dtype)
+                new[:self.count] = old[:self.count]
+                setattr(self, name, new)
+        self.count += 1
+        return self.count - 1
+
+    def _reserve(self, extra):
+        size = len(self.data)
+        while size < self.used + extra:
+            size *= 2
+        data = np.zeros(size, dtype=np.uint8)
+        data[:self.used] = self.data[:self.used]
+        self.data = data
+
+    def _compact(self):
+        # Copy live strings to the front of a new buffer; codes stay the same
+        live = np.flatnonzero(self.refs[:self.count] > 0)
+        data = np.zeros(max(len(self.data) // 2, 4096), dtype=np.uint8)
+        used = 0
+        for code in live:
+            start, n = self.offset[code], self.length[code]
+            data[used:used + n] = self.data[start:start + n]
+            self.offset[code] = used
+            used += n
+        self.length[:self.count][self.refs[:self.count] == 0] = 0
+        self.data, self.used, self.dead = data, used, 0
+
+    def _rehash(self):
+        size = len(self.table)
+        while size < 2 * max(len(self), 1):
+            size *= 2
+        self.table = np.full(size, EMPTY, dtype=np.int32)
+        live = np.flatnonzero(self.refs[:self.count] > 0)
+        self.table_used = len(live)
+        mask = size - 1
+        for code in live:
+            i = hash(self._bytes(code)) & mask
+            while self.table[i] != EMPTY:
+                i = (i + 1) & mask
+            self.table[i] = code
+
+class CompactTaskStore:
+    """
+    Columnar task store. CPU, RAM and score live in float32 arrays, desc is an
+    int32 code into a StringPool, and rows stay dense (delete moves the last
+    row into the hole), so column updates are vectorized. The (desc, folder) index is an open-addressing hash table
+    of row numbers and every folder keeps a linked list of its rows through
+    next/prev arrays, so lookup, delete and per-folder iteration need no
+    per-task Python objects.
+    """
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.strings = StringPool()
+        self.desc = np.zeros(capacity, dtype=np.int32)
+        self.folder_id = np.zeros(capacity, dtype=np.int32)
+        self.pid = np.full(capacity, -1, dtype=np.int32)
+        self.CPU = np.zeros(capacity, dtype=np.float32)
+        self.RAM = np.zeros(capacity, dtype=np.float32)
+        self.score = np.zeros(capacity, dtype=np.float32)
+        self.next_row = np.full(capacity, -1, dtype=np.int32)
+        self.prev_row = np.full(capacity, -1, dtype=np.int32)
+        self.folders, self.folder_ids, self.folder_head = [], {}, []
+        self.table = np.full(2 * capacity, EMPTY, dtype=np.int32)
+        self.table_used = 0
+
+    def __len__(self):
+        return self.size
+
+    def _slot(self, desc, folder_id):
+        """
+        Return (slot, row) for a (desc code, folder id) key; row is -1 if absent
+        and slot is where it would go
+        """
+        mask = len(self.table) - 1
+        i = hash((desc, folder_id)) & mask
+        free = -1
+        while True:
+            row = int(self.table[i])
+            if row == EMPTY:
+                return (free if free >= 0 else i), -1
+            if row == DELETED:
+                if free < 0:
+                    free = i
+            elif self.desc[row] == desc and self.folder_id[row] == folder_id:
+                return i, row
+            i = (i + 1) & mask
+
+    def _rehash(self):
+        size = len(self.table)
+        while size < 2 * max(self.size, 1):
+            size *= 2
+        self.table = np.full(size, EMPTY, dtype=np.int32)
+        self.table_used = self.size
+        for row in range(self.size):
+            slot, _ = self._slot(int(self.desc[row]), int(self.folder_id[row]))
+            self.table[slot] = row
+
+    def _grow(self):
+        capacity = 2 * len(self.CPU)
+        for name in ("desc", "folder_id", "pid", "CPU", "RAM", "score", "next_row", "prev_row"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _link(self, row, folder_id):
+        head = self.folder_head[folder_id]
+        self.prev_row[row] = -1
+        self.next_row[row] = head
+        if head >= 0:
+            self.prev_row[head] = row
+        self.folder_head[folder_id] = row
+
+    def _unlink(self, row):
+        prev, nxt = int(self.prev_row[row]), int(self.next_row[row])
+        if prev >= 0:
+            self.next_row[prev] = nxt
+        else:
+            self.folder_head[self.folder_id[row]] = nxt
+        if nxt >= 0:
+            self.prev_row[nxt] = prev
+
+    def add(self, desc, folder, CPU=0.0, RAM=0.0, score=0.0, pid=-1):
+        """
+        Insert a task, or overwrite the existing one with the same (desc, folder)
+        """
+        folder_id = self.folder_ids.get(folder)
+        if folder_id is None:
+            folder_id = self.folder_ids[folder] = len(self.folders)
+            self.folders.append(folder)
+            self.folder_head.append(-1)
+        code = self.strings.find(desc)
+        row = self._slot(code, folder_id)[1] if code >= 0 else -1
+        if row < 0:
+            if self.size == len(self.CPU):
+                self._grow()
+            if (self.table_used + 1) * 10 > len(self.table) * 6:
+                self._rehash()
+            code = self.strings.intern(desc)
+            slot, _ = self._slot(code, folder_id)
+            if self.table[slot] == EMPTY:
+                self.table_used += 1
+            row = self.size
+            self.size += 1
+            self.table[slot] = row
+            self.desc[row] = code
+            self.folder_id[row] = folder_id
+            self._link(row, folder_id)
+        self.CPU[row] = CPU
+        self.RAM[row] = RAM
+        self.score[row] = score
+        self.pid[row] = pid
+        return row
+
+    def find(self, desc, folder):
+        folder_id = self.folder_ids.get(folder)
+        if folder_id is None:
+            return None
+        code = self.strings.find(desc)
+        row = self._slot(code, folder_id)[1] if code >= 0 else -1
+        return row if row >= 0 else None
+
+    def get(self, desc, folder):
+        row = self.find(desc, folder)
+        return None if row is None else self.record(row)
+
+    def delete(self, desc, folder):
+        folder_id = self.folder_ids.get(folder)
+        if folder_id is None:
+            return False
+        code = self.strings.find(desc)
+        if code < 0:
+            return False
+        slot, row = self._slot(code, folder_id)
+        if row < 0:
+            return False
+        self.table[slot] = DELETED
+        self._unlink(row)
+        last = self.size - 1
+        if row != last:
+            # Move the last row into the hole and repoint its index entries
+            last_slot, _ = self._slot(int(self.desc[last]), int(self.folder_id[last]))
+            self.table[last_slot] = row
+            for column in (self.desc, self.folder_id, self.pid, self.CPU, self.RAM,
+                           self.score, self.next_row, self.prev_row):
+                column[row] = column[last]
+            prev, nxt = int(self.prev_row[row]), int(self.next_row[row])
+            if prev >= 0:
+                self.next_row[prev] = row
+            else:
+                self.folder_head[self.folder_id[row]] = row
+            if nxt >= 0:
+                self.prev_row[nxt] = row
+        self.size = last
+        self.strings.release(code)
+        return True
+
+    def record(self, row):
+        return {
+            "desc": self.strings.get(self.desc[row]),
+            "folder": self.folders[self.folder_id[row]],
+            "CPU": float(self.CPU[row]),
+            "RAM": float(self.RAM[row]),
+            "score": float(self.score[row]),
+            **({"pid": int(self.pid[row])} if self.pid[row] >= 0 else {}),
+        }
+
+    def folder_rows(self, folder):
+        folder_id = self.folder_ids.get(folder)
+        row = self.folder_head[folder_id] if folder_id is not None else -1
+        while row >= 0:
+            yield row
+            row = int(self.next_row[row])
+
+    def folder_tasks(self, folder):
+        return [self.record(row) for row in self.folder_rows(folder)]
+
+    def update_usage(self, rows, CPU=None, RAM=None):
+        """
+        Vectorized write of CPU/RAM values for the given rows (NaN keeps the old value)
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        for column, values in ((self.CPU, CPU), (self.RAM, RAM)):
+            if values is None:
+                continue
+            values = np.asarray(values, dtype=np.float32)
+            valid = ~np.isnan(values)
+            column[rows[valid]] = values[valid]
+
+    def records(self):
+        """
+        Snapshot as a list of new dicts; callers never alias store state
+        """
+        return [self.record(row) for row in range(self.size)]
+
+    def snapshot(self):
+        """
+        Snapshot as a DataFrame built from column copies
+        """
+        n = self.size
+        codes, inverse = np.unique(self.desc[:n], return_inverse=True)
+        descs = np.array([self.strings.get(code) for code in codes], dtype=object)
+        return pd.DataFrame({
+            "desc": descs[inverse],
+            "folder": np.array(self.folders, dtype=object)[self.folder_id[:n]] if n else [],
+            "CPU": self.CPU[:n].copy(),
+            "RAM": self.RAM[:n].copy(),
+            "score": self.score[:n].copy(),
+        })
+
+tasks_store = CompactTaskStore()
 
 def generate_dummy_tasks(n=5):
     actions = ["Fix", "Update", "Test", "Write", "Analyze", "Deploy", "Debug", "Refactor"]
@@ -21,25 +371,38 @@ def generate_dummy_tasks(n=5):
     return dummy_tasks
 
 def add_task(task, folder):
-    task_copy = task.copy()
-    task_copy["folder"] = folder
-    tasks_store.append(task_copy)
+    pid = task.get("pid", -1)
+    row = tasks_store.find(task["desc"], folder)
+    if row is not None and tasks_store.pid[row] >= 0:
+        # Overwriting a task releases the process it was watching
+        get_sampler().untrack(int(tasks_store.pid[row]))
+    tasks_store.add(task["desc"], folder, task.get("CPU", 0.0), task.get("RAM", 0.0),
+                    task.get("score", 0.0), pid)
+    if pid >= 0:
+        get_sampler().track(pid)
 
 def get_all_tasks():
-    for t in tasks_store:
-        t["CPU"] = random.randint(5, 80)
-        t["RAM"] = random.randint(50, 500)
-    return tasks_store
+    # Tasks bound to a process get its smoothed CPU % and RSS MB; others keep their values
+    rows = np.flatnonzero(tasks_store.pid[:len(tasks_store)] >= 0)
+    if len(rows):
+        usage = get_sampler().smoothed(tasks_store.pid[rows].tolist())
+        tasks_store.update_usage(rows, usage["cpu_ewma"], usage["rss_ewma"])
+    return tasks_store.records()
+
+def get_folder_tasks(folder):
+    return tasks_store.folder_tasks(folder)
 
 def delete_task(desc, folder):
-    global tasks_store
-    tasks_store = [t for t in tasks_store if not (t["desc"]==desc and t["folder"]==folder)]
+    row = tasks_store.find(desc, folder)
+    if row is None:
+        return
+    pid = int(tasks_store.pid[row])
+    tasks_store.delete(desc, folder)
+    if pid >= 0:
+        get_sampler().untrack(pid)
 
 def log_to_csv():
-    df = pd.DataFrame(tasks_store)
-    if not df.empty:
-        df["timestamp"] = pd.Timestamp.now()
-        if TASKS_FILE.exists():
-            df.to_csv(TASKS_FILE, mode='a', index=False, header=False)
-        else:
-            df.to_csv(TASKS_FILE, index=False)
+    # Goes through the shared telemetry writer; use get_log().export_csv() for a CSV file
+    if len(tasks_store):
+        timestamp = pd.Timestamp.now()
+        get_log().append_many({**t, "timestamp": timestamp} for t in tasks_store.records())
@@ -0,0 +1,231 @@
+import atexit
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+LOG_DIR = Path("tasks_log")
+
+# Fixed schema so every chunk has the same compact column layout
+SCHEMA = {
+    "timestamp": np.float64,
+    "desc": str,
+    "folder": str,
+    "CPU": np.float32,
+    "RAM": np.float32,
+    "score": np.float32,
+    "total_score": np.float32,
+}
+
+class TelemetryLog:
+    """
+    Append-only task telemetry log.
+
+    Rows are buffered in memory and a background thread flushes them in batches
+    as compressed columnar .npz chunks named by their global row range, so a
+    reader can resume from any row offset. Small chunks are periodically
+    compacted into larger ones and the oldest chunks beyond retain_rows dropped.
+    """
+    def __init__(self, directory=LOG_DIR, flush_rows=1000, flush_interval=2.0,
+                 compact_chunks=16, retain_rows=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.compact_chunks = compact_chunks
+        self.retain_rows = retain_rows
+        # Chunks below this size are merged together during compaction
+        self.compacted_rows = flush_rows * compact_chunks
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        chunks = self.chunks()
+        self.next_row = chunks[-1][1] if chunks else 0
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -----------------------------
+    # Writing
+    def append(self, row):
+        with self._lock:
+            self._buffer.append(dict(row))
+            full = len(self._buffer) >= self.flush_rows
+        if full:
+            self._wake.set()
+
+    def append_many(self, rows):
+        with self._lock:
+            self._buffer.extend(dict(row) for row in rows)
+            full = len(self._buffer) >= self.flush_rows
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Telemetry flush failed: {e}")
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            now = time.time()
+            columns = {}
+            for name, dtype in SCHEMA.items():
+                if dtype is str:
+                    columns[name] = np.array([str(row.get(name, "")) for row in rows])
+                elif name == "timestamp":
+                    columns[name] = np.array([_epoch(row.get(name, now)) for row in rows], dtype=dtype)
+                else:
+                    columns[name] = np.array([row.get(name, np.nan) for row in rows], dtype=dtype)
+            start = self.next_row
+            self._write_chunk(start, columns)
+            self.next_row = start + len(rows)
+            if len(self._small_chunks()) >= self.compact_chunks:
+                self.compact()
+
+    def _write_chunk(self, start, columns):
+        n_rows = len(next(iter(columns.values())))
+        path = self.directory / f"chunk-{start:012d}-{start + n_rows:012d}.npz"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **columns)
+        os.replace(tmp_path, path)
+        return path
+
+    def _small_chunks(self):
+        return [c for c in self.chunks() if c[1] - c[0] < self.compacted_rows]
+
+    def _small_runs(self):
+        """
+        Runs of small chunks with adjacent row ranges. A large flush can sit
+        between small chunks, so the small ones are not one contiguous tail.
+        """
+        runs = []
+        run = []
+        for chunk in self.chunks():
+            if chunk[1] - chunk[0] >= self.compacted_rows or (run and run[-1][1] != chunk[0]):
+                if len(run) > 1:
+                    runs.append(run)
+                run = []
+            if chunk[1] - chunk[0] < self.compacted_rows:
+                run.append(chunk)
+        if len(run) > 1:
+            runs.append(run)
+        return runs
+
+    def compact(self):
+        """
+        Drop the oldest chunks beyond retain_rows and merge each run of adjacent small chunks
+        """
+        with self._write_lock:
+            chunks = self.chunks()
+            if self.retain_rows is not None:
+                while len(chunks) > 1 and chunks[-1][1] - chunks[0][1] >= self.retain_rows:
+                    os.remove(chunks.pop(0)[2])
+            for run in self._small_runs():
+                parts = [_load_chunk(path) for _, _, path in run]
+                columns = {name: np.concatenate([p[name] for p in parts]) for name in SCHEMA}
+                self._write_chunk(run[0][0], columns)
+                for _, _, path in run:
+                    os.remove(path)
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    # -----------------------------
+    # Reading
+    def chunks(self):
+        """
+        Return [(start_row, end_row, path)] in row order
+        """
+        return list_chunks(self.directory)
+
+    def iter_frames(self, start_row=0):
+        """
+        Yield (end_row, DataFrame) for every chunk holding rows at or after start_row
+        """
+        yield from iter_frames(self.directory, start_row)
+
+    def export_csv(self, path):
+        """
+        Write the whole log to CSV, one chunk at a time
+        """
+        # Hold the write lock so the writer cannot compact chunks mid-export
+        with self._write_lock:
+            self.flush()
+            header = True
+            with open(path, "w", newline="") as f:
+                for _, df in self.iter_frames():
+                    df = df.assign(timestamp=pd.to_datetime(df["timestamp"], unit="s"))
+                    df.to_csv(f, header=header, index=False)
+                    header = False
+        return path
+
+def _epoch(value):
+    if isinstance(value, pd.Timestamp):
+        return value.timestamp()
+    return float(value)
+
+def _load_chunk(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+def list_chunks(directory=LOG_DIR):
+    chunks = []
+    for path in Path(directory).glob("chunk-*.npz"):
+        _, start, end = path.stem.split("-")
+        chunks.append((int(start), int(end), path))
+    return sorted(chunks)
+
+def iter_frames(directory=LOG_DIR, start_row=0):
+    row = start_row
+    while True:
+        for start, end, path in list_chunks(directory):
+            if end <= row:
+                continue
+            try:
+                df = pd.DataFrame(_load_chunk(path))
+            except FileNotFoundError:
+                # Compacted or dropped by the writer since listing: list again from row
+                break
+            if start < row:
+                df = df.iloc[row - start:]
+            yield end, df
+            row = end
+        else:
+            return
+
+def read_log(directory=LOG_DIR):
+    frames = [df for _, df in iter_frames(directory)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(SCHEMA))
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+def get_log(directory=LOG_DIR, **kwargs):
+    """
+    Process-wide TelemetryLog per directory, shared by every writer
+    """
+    key = Path(directory).resolve()
+    with _logs_lock:
+        if key not in _logs:
+            _logs[key] = TelemetryLog(directory, **kwargs)
+        return _logs[key]
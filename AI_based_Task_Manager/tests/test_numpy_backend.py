@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from numpy_backend import NumpyModel, score_column
+
+MODEL_PATH = os.path.join(ROOT, "rnn_task_model.h5")
+
+@pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason="no saved model")
+def test_numpy_model_matches_keras():
+    keras = pytest.importorskip("tensorflow").keras
+    expected = keras.models.load_model(MODEL_PATH, compile=False)
+    model = NumpyModel.from_h5(MODEL_PATH)
+    assert model is not None
+    X = np.random.default_rng(0).uniform(0, 300, size=(64,) + expected.input_shape[1:]).astype(np.float32)
+    outputs = model.predict(X)
+    reference = expected.predict(X, verbose=0)
+    assert len(outputs) == len(reference)
+    for got, want in zip(outputs, reference):
+        np.testing.assert_allclose(got, want, rtol=1e-4, atol=1e-4)
+    np.testing.assert_allclose(score_column(outputs), score_column(reference), rtol=1e-4, atol=1e-4)
+
+def test_score_column_picks_regression_output():
+    classes = np.full((3, 6), 0.5)
+    scores = np.array([[1.0], [2.0], [3.0]])
+    np.testing.assert_array_equal(score_column([classes, scores]), [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(score_column(scores), [1.0, 2.0, 3.0])
@@ -0,0 +1,54 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_queue import IndexedPriorityQueue, _heap_order
+
+def is_max_heap(values):
+    n = len(values)
+    return all(values[(i - 1) // 2] >= values[i] for i in range(1, n))
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 7, 8, 100, 1023, 1024, 5000])
+def test_heap_order_is_a_heap_permutation(n):
+    rng = np.random.default_rng(n)
+    priorities = rng.integers(0, max(n // 4, 1), size=n).astype(np.float64)  # many ties
+    order = _heap_order(priorities)
+    assert sorted(order.tolist()) == list(range(n))
+    assert is_max_heap(priorities[order].tolist())
+
+def check_queue(queue, expected):
+    assert len(queue) == len(expected)
+    assert is_max_heap([queue.priority[key] for key in queue.heap])
+    assert queue._positions() == {key: i for i, key in enumerate(queue.heap)}
+    best = sorted(expected.values(), reverse=True)
+    assert [queue.priority[key] for key in queue.top_k(10)] == best[:10]
+
+def test_queue_matches_reference():
+    rng = random.Random(0)
+    queue = IndexedPriorityQueue()
+    expected = {}
+    for step in range(3000):
+        op = rng.random()
+        if op < 0.5 or not expected:
+            key = rng.randrange(400)
+            priority = rng.randrange(100)
+            queue.push(key, priority)
+            expected[key] = priority
+        elif op < 0.8:
+            key = rng.choice(list(expected))
+            queue.remove(key)
+            del expected[key]
+        else:
+            # Few changes take the sift path, many take the heapify rebuild
+            keys = rng.sample(list(expected), rng.randint(1, len(expected)))
+            updates = {key: rng.randrange(100) for key in keys}
+            queue.update_many(updates)
+            expected.update(updates)
+        if step % 50 == 0:
+            check_queue(queue, expected)
+    check_queue(queue, expected)
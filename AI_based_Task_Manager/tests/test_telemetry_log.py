@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry_log import TelemetryLog, read_log
+
+def rows(start, n):
+    return [{"timestamp": 1.0e9 + i, "desc": f"task {i}", "folder": "Work", "CPU": i % 50,
+             "RAM": 100 + i % 7, "score": 0.5, "total_score": 1.0} for i in range(start, start + n)]
+
+def test_compact_merges_only_adjacent_small_chunks(tmp_path):
+    # Small chunks are < flush_rows * compact_chunks = 1000 rows
+    log = TelemetryLog(tmp_path, flush_rows=10, flush_interval=3600, compact_chunks=100)
+    sizes = [3, 3, 3, 1000, 3, 3]
+    start = 0
+    for n in sizes:
+        log.append_many(rows(start, n))
+        log.flush()
+        start += n
+    before = read_log(tmp_path)
+    large = [path for first, last, path in log.chunks() if last - first == 1000]
+
+    log.compact()
+
+    assert [(first, last) for first, last, _ in log.chunks()] == [(0, 9), (9, 1009), (1009, 1015)]
+    assert [path for first, last, path in log.chunks() if last - first == 1000] == large
+    after = read_log(tmp_path)
+    assert after.equals(before)
+    assert after["desc"].tolist() == [f"task {i}" for i in range(start)]
+    log.close()
+
+def test_compact_drops_chunks_beyond_retention(tmp_path):
+    log = TelemetryLog(tmp_path, flush_rows=10, flush_interval=3600, compact_chunks=100, retain_rows=10)
+    for start in range(0, 30, 5):
+        log.append_many(rows(start, 5))
+        log.flush()
+    log.compact()
+    frames = read_log(tmp_path)
+    assert len(frames) >= 10
+    assert np.array_equal(frames["timestamp"].to_numpy(), 1.0e9 + np.arange(30 - len(frames), 30))
+    log.close()
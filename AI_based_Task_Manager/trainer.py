@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from ai_model import MODEL_FILE
+from telemetry_log import LOG_DIR, iter_frames, list_chunks
+
+CHECKPOINT_FILE = Path("trainer_checkpoint.json")
+
+class IncrementalTrainer:
+    """
+    Background fine-tuning of the serving model.
+
+    Every interval seconds the worker reads only the telemetry rows written
+    since the last checkpoint, in chunks, fine-tunes a copy of the serving
+    model on them and atomically swaps the new weights in. Training cost scales
+    with the amount of new data, not with the whole history. A serving model
+    that cannot be fine-tuned is only replaced once the log holds
+    min_data_rows rows, by a new model trained on all of them.
+    """
+    def __init__(self, rnn_model, log_dir=LOG_DIR, checkpoint_file=CHECKPOINT_FILE,
+                 interval=30.0, chunk_rows=4096, min_new_rows=256, epochs=1):
+        self.rnn_model = rnn_model
+        self.log_dir = Path(log_dir)
+        self.checkpoint_file = Path(checkpoint_file)
+        self.interval = interval
+        self.chunk_rows = chunk_rows
+        self.min_new_rows = min_new_rows
+        self.epochs = epochs
+        self.checkpoint = self._load_checkpoint()
+        self.last_run_seconds = 0.0
+        self.last_rows = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load_checkpoint(self):
+        if self.checkpoint_file.exists():
+            with open(self.checkpoint_file) as f:
+                return json.load(f)
+        return {"row": 0, "rows_trained": 0, "updated": None}
+
+    def _save_checkpoint(self):
+        tmp_path = self.checkpoint_file.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_file)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="incremental-trainer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.train_step()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Incremental training failed: {e}")
+
+    def logged_rows(self):
+        chunks = list_chunks(self.log_dir)
+        return chunks[-1][1] if chunks else 0
+
+    def _training_copy(self):
+        """
+        Copy of the serving model to fine-tune, or None if it cannot be fine-tuned
+        (missing, or not a (CPU, RAM) -> score regressor)
+        """
+        # Fine-tune a copy so the serving model is never touched mid-fit.
+        # TensorFlow is only imported here, once there is something to train.
+        import tensorflow as tf
+        from tensorflow.keras.losses import MeanSquaredError
+
+        serving = self.rnn_model.keras_model()
+        if serving is None or serving.input_shape != (None, 2) or serving.output_shape != (None, 1):
+            return None
+        model = tf.keras.models.clone_model(serving)
+        model.set_weights(serving.get_weights())
+        model.compile(optimizer="adam", loss=MeanSquaredError())
+        return model
+
+    def train_step(self):
+        """
+        Fine-tune on rows added since the checkpoint; returns the number of rows used
+        """
+        start_row = self.checkpoint["row"]
+        if self.logged_rows() - start_row < self.min_new_rows:
+            return 0
+        started = time.perf_counter()
+        model = self._training_copy()
+        if model is None:
+            # Nothing to fine-tune: keep the shipped model until the log holds enough
+            # rows to train a replacement from scratch, then train it on all of them
+            if sum(end - start for start, end, _ in list_chunks(self.log_dir)) < self.rnn_model.min_data_rows:
+                return 0
+            model = self.rnn_model.build_model(2)
+            start_row = 0
+        end_row = start_row
+        rows = 0
+        for chunk_end, df in iter_frames(self.log_dir, start_row):
+            for offset in range(0, len(df), self.chunk_rows):
+                X, y = self.rnn_model.preprocess(df.iloc[offset:offset + self.chunk_rows])
+                if len(X):
+                    model.fit(X, y, epochs=self.epochs, verbose=0)
+                    rows += len(X)
+            end_row = chunk_end
+
+        # Write the file atomically, then swap the serving model in one step
+        tmp_path = MODEL_FILE.with_name("tmp_" + MODEL_FILE.name)
+        model.save(tmp_path)
+        os.replace(tmp_path, MODEL_FILE)
+        self.rnn_model.swap_model(model)
+
+        self.checkpoint = {
+            "row": end_row,
+            "rows_trained": self.checkpoint["rows_trained"] + rows,
+            "updated": time.time(),
+        }
+        self._save_checkpoint()
+        self.last_run_seconds = time.perf_counter() - started
+        self.last_rows = rows
+        self.last_error = None
+        return rows
+
+    def status(self):
+        """
+        Lag (rows not yet trained on, seconds since the last swap) and throughput
+        """
+        updated = self.checkpoint["updated"]
+        return {
+            "lag_rows": self.logged_rows() - self.checkpoint["row"],
+            "lag_seconds": time.time() - updated if updated else None,
+            "rows_trained": self.checkpoint["rows_trained"],
+            "last_rows": self.last_rows,
+            "last_run_seconds": self.last_run_seconds,
+            "rows_per_sec": self.last_rows / self.last_run_seconds if self.last_run_seconds else 0.0,
+            "last_error": self.last_error,
+        }
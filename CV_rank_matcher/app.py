@@ -30,6 +30,8 @@ Key Features:
 4. Pairwise Similarity:
    - Computes cosine similarity between CVs using TF-IDF vectorization.
    - Identifies how similar CVs are in terms of content and skills.
+   - Uses MinHash signatures with LSH banding to find the top-k most similar CVs
+     and clusters of near-duplicate resumes without comparing every pair.
 
 5. TrueSkill Ranking:
    - Implements a TrueSkill-based ranking system (similar to ELO rating in chess).
@@ -74,9 +76,11 @@ Potential Extensions:
 
 
 import streamlit as st
-from utils.file_parser import extract_text
-from utils.scoring import compute_similarity, skill_score
-from utils.ranking import compare_pair
+from utils.file_parser import TextCache, content_ids, extract_texts
+from utils.scoring import CorpusSimilarity
+from utils.keyword_index import InvertedIndex, hit_column
+from utils.minhash import MinHashLSH
+from utils.ranking import Tournament
 import pandas as pd
 
 st.markdown("""
@@ -107,25 +111,87 @@ keywords_input = st.text_area(
 )
 keywords = [k.strip() for k in keywords_input.split(",")]
 
+@st.cache_resource
+def get_text_cache():
+    # Shared across reruns so editing keywords does not re-parse every CV
+    return TextCache()
+
 if uploaded_files and len(uploaded_files) >= 2:
-    cv_texts = [extract_text(f) for f in uploaded_files]
+    text_cache = get_text_cache()
+    cv_texts, extract_errors = extract_texts(uploaded_files, cache=text_cache)
+    for i, error in extract_errors:
+        st.warning(f"Could not read {uploaded_files[i].name} ({error}); it is scored as empty.")
+    cache_stats = text_cache.stats()
+    st.caption(f"Text cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
     cv_names = [f.name for f in uploaded_files]
+    cv_ids = content_ids(uploaded_files)
     
+    # Index the CVs once per upload set (by content, not file name); new keyword lists reuse the postings
+    if st.session_state.get("cv_index_ids") != cv_ids:
+        cv_index = InvertedIndex()
+        cv_index.add_all(cv_texts)
+        st.session_state.cv_index = cv_index
+        lsh_index = MinHashLSH()
+        lsh_index.add_all(cv_texts)
+        st.session_state.lsh_index = lsh_index
+        st.session_state.similarity = CorpusSimilarity(cv_texts)
+        st.session_state.cv_index_ids = cv_ids
+    cv_index = st.session_state.cv_index
+    lsh_index = st.session_state.lsh_index
+    similarity = st.session_state.similarity
+
     # Compute skill scores
-    scores = [skill_score(t, keywords) for t in cv_texts]
+    results = cv_index.score(keywords)
+    scores = [r["matched"] for r in results]
     
     # Pairwise comparison and ranking
     n = len(cv_texts)
-    ratings = [score for score in scores]  # start with skill scores
-    leaderboard = pd.DataFrame({"CV": cv_names, "Score": ratings})
+    # Ratings persist across reruns; only new CVs play placement matches.
+    # Players are keyed by content hash, so two files with the same name stay
+    # separate and a re-uploaded CV keeps its rating.
+    # A different keyword list changes every score, so it starts a new tournament.
+    tournament = st.session_state.get("tournament")
+    if tournament is None or st.session_state.get("tournament_keywords") != keywords:
+        tournament = Tournament()
+        for cv_id, score in zip(cv_ids, scores):
+            tournament.add(cv_id, score)
+        tournament.run()
+        st.session_state.tournament = tournament
+        st.session_state.tournament_keywords = keywords
+    else:
+        tournament.remove(set(tournament.ratings) - set(cv_ids))
+        new_scores = {cv_id: score for cv_id, score in zip(cv_ids, scores) if cv_id not in tournament.ratings}
+        if new_scores:
+            tournament.add_and_rank(new_scores)
+    ratings = {cv_id: rating for cv_id, rating, _, _ in tournament.leaderboard()}
+
+    leaderboard = pd.DataFrame({"CV": cv_names, "Score": scores})
+    leaderboard["TrueSkill"] = [ratings[cv_id] for cv_id in cv_ids]
+    leaderboard["Weighted Score"] = [r["weighted"] for r in results]
+    hits = pd.DataFrame([r["hits"] for r in results]).rename(columns=hit_column)
+    leaderboard = pd.concat([leaderboard, hits], axis=1)
     
     # Show leaderboard
     st.subheader("CV Leaderboard")
-    st.dataframe(leaderboard.sort_values("Score", ascending=False))
+    st.dataframe(leaderboard.sort_values("TrueSkill", ascending=False))
+    st.caption(f"{tournament.matches} TrueSkill matches played")
     
-    # Optional: show pairwise similarity
-    st.subheader("Pairwise Similarity")
-    for i in range(n):
-        for j in range(i+1, n):
-            sim = compute_similarity(cv_texts[i], cv_texts[j])
-            st.write(f"{cv_names[i]} vs {cv_names[j]} → Similarity: {sim:.2f}")
+    # Optional: show similar CVs (LSH candidates only, no all-pairs loop)
+    st.subheader("Similar CVs")
+    selected = st.selectbox("CV", range(n), format_func=lambda i: cv_names[i])
+    neighbours = lsh_index.top_k(selected, k=5)
+    if neighbours:
+        st.dataframe(pd.DataFrame({
+            "CV": [cv_names[j] for j, _ in neighbours],
+            "Jaccard (est.)": [jac for _, jac in neighbours],
+            "TF-IDF Similarity": [similarity.similarity(selected, j) for j, _ in neighbours],
+        }))
+    else:
+        st.write("No similar CVs found.")
+
+    st.subheader("Near-Duplicate CVs")
+    clusters = lsh_index.near_duplicate_clusters(threshold=0.8)
+    for cluster in clusters:
+        st.write(" ≈ ".join(cv_names[i] for i in cluster))
+    if not clusters:
+        st.write("No near-duplicates found.")
@@ -0,0 +1,144 @@
+"""
+Headless batch ranking for a directory of CVs.
+
+Streams PDF/DOCX files in chunks (text for at most one chunk is held in memory),
+scores them against a keyword list, finds near-duplicates with MinHash/LSH,
+ranks them with the TrueSkill tournament and writes the leaderboard with the
+per-CV features to a Parquet file.
+
+Usage:
+    python batch_rank.py /path/to/cvs --keywords "Python, Machine Learning" --output leaderboard.parquet
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.file_parser import EXTENSION_TYPES, LocalFile, TextCache, extract_texts
+from utils.keyword_index import KeywordMatcher, hit_column
+from utils.minhash import MinHashLSH
+from utils.ranking import Tournament
+
+def iter_cv_paths(directory):
+    """
+    Lazily yield every PDF/DOCX path below directory
+    """
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in EXTENSION_TYPES:
+                yield os.path.join(root, name)
+
+def iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def rank_directory(directory, keywords, chunk_size=256, workers=None, cache=None):
+    """
+    Rank every CV below directory and return the leaderboard DataFrame
+    """
+    matcher = KeywordMatcher(keywords)
+    lsh_index = MinHashLSH()
+    rows = []
+    doc_freq = dict.fromkeys(matcher.keywords, 0)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in iter_chunks(iter_cv_paths(directory), chunk_size):
+            files = [LocalFile(path) for path in chunk]
+            texts, errors = extract_texts(files, cache=cache, pool=pool)
+            failed = dict(errors)
+            for i, error in errors:
+                print(f"Could not read {files[i].path}: {error}", flush=True)
+            for i, (file, text) in enumerate(zip(files, texts)):
+                hits = matcher.count(text)
+                for keyword, count in hits.items():
+                    if count:
+                        doc_freq[keyword] += 1
+                lsh_index.add(text)
+                rows.append({
+                    "CV": file.name,
+                    "path": file.path,
+                    "chars": len(text),
+                    "Extraction Error": failed.get(i),
+                    "Score": sum(1 for count in hits.values() if count > 0),
+                    **{hit_column(keyword): count for keyword, count in hits.items()},
+                })
+            elapsed = time.perf_counter() - start
+            print(f"Processed {len(rows)} files ({len(rows) / elapsed:.1f} files/sec)", flush=True)
+
+    leaderboard = pd.DataFrame(rows)
+    if leaderboard.empty:
+        return leaderboard
+
+    # IDF weights need the document frequencies of the whole corpus
+    n = len(leaderboard)
+    leaderboard["Weighted Score"] = 0.0
+    for keyword, df in doc_freq.items():
+        counts = leaderboard[hit_column(keyword)].to_numpy()
+        weight = math.log((n + 1) / (df + 1)) + 1.0
+        leaderboard["Weighted Score"] += np.where(counts > 0, weight * (1.0 + np.log(np.maximum(counts, 1))), 0.0)
+
+    # Near-duplicate clusters and nearest neighbour from LSH candidates only
+    leaderboard["Duplicate Cluster"] = -1
+    for cluster_id, members in enumerate(lsh_index.near_duplicate_clusters()):
+        leaderboard.loc[members, "Duplicate Cluster"] = cluster_id
+    neighbours = [lsh_index.top_k(i, k=1) for i in range(n)]
+    leaderboard["Nearest CV"] = [leaderboard["CV"].iat[nb[0][0]] if nb else None for nb in neighbours]
+    leaderboard["Nearest Jaccard"] = [nb[0][1] if nb else 0.0 for nb in neighbours]
+
+    # Paths are unique, names may not be
+    tournament = Tournament()
+    for path, score in zip(leaderboard["path"], leaderboard["Score"]):
+        tournament.add(path, score)
+    ratings = {path: (rating, mu, sigma) for path, rating, mu, sigma in tournament.run()}
+    leaderboard["TrueSkill"] = [ratings[path][0] for path in leaderboard["path"]]
+    leaderboard["mu"] = [ratings[path][1] for path in leaderboard["path"]]
+    leaderboard["sigma"] = [ratings[path][2] for path in leaderboard["path"]]
+
+    leaderboard = leaderboard.sort_values("TrueSkill", ascending=False).reset_index(drop=True)
+    leaderboard.insert(0, "Rank", range(1, n + 1))
+    elapsed = time.perf_counter() - start
+    print(f"Ranked {n} CVs in {elapsed:.1f}s ({n / elapsed:.1f} files/sec, {tournament.matches} matches)", flush=True)
+    return leaderboard
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank a directory of CVs without Streamlit")
+    parser.add_argument("directory", help="Directory containing PDF/DOCX CVs")
+    parser.add_argument("--keywords", default="Python, Machine Learning, Data Analysis",
+                        help="Comma separated skills/keywords")
+    parser.add_argument("--keywords-file", help="File with one keyword per line (overrides --keywords)")
+    parser.add_argument("--output", default="leaderboard.parquet", help="Output Parquet file")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Files parsed per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--cache-dir", default=".cv_text_cache", help="Extracted text cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the text cache")
+    args = parser.parse_args()
+
+    if args.keywords_file:
+        with open(args.keywords_file, encoding="utf-8") as f:
+            keywords = [line.strip() for line in f if line.strip()]
+    else:
+        keywords = [k.strip() for k in args.keywords.split(",")]
+
+    cache = None if args.no_cache else TextCache(args.cache_dir)
+    leaderboard = rank_directory(args.directory, keywords, args.chunk_size, args.workers, cache)
+    if leaderboard.empty:
+        print("No PDF/DOCX files found.")
+        return
+    leaderboard.to_parquet(args.output, index=False)
+    print(f"Wrote {len(leaderboard)} rows to {args.output}")
+    if cache is not None:
+        print(f"Text cache: {cache.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,192 @@
+import io
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
 import PyPDF2
 import docx
 
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+EXTENSION_TYPES = {".pdf": PDF_TYPE, ".docx": DOCX_TYPE}
+
 def extract_text(file):
     """
     Extract text from PDF or DOCX files
     """
-    if file.type == "application/pdf":
-        pdf = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text()
-        return text
-    elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        doc = docx.Document(file)
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text
+    return extract_text_from_bytes(file.getvalue(), file.type)
+
+def extract_text_from_bytes(data, file_type):
+    """
+    Extract text from raw PDF or DOCX bytes
+    """
+    if file_type == PDF_TYPE:
+        pdf = PyPDF2.PdfReader(io.BytesIO(data))
+        # Join once instead of repeated string concatenation
+        return "".join(page.extract_text() or "" for page in pdf.pages)
+    elif file_type == DOCX_TYPE:
+        doc = docx.Document(io.BytesIO(data))
+        return "\n".join(para.text for para in doc.paragraphs)
     else:
         return ""
+
+def file_type_from_name(name):
+    """
+    Guess the MIME type of a CV from its file extension
+    """
+    return EXTENSION_TYPES.get(os.path.splitext(name)[1].lower(), "")
+
+class LocalFile:
+    """
+    A CV on disk with the same interface as a Streamlit upload
+    """
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.type = file_type_from_name(path)
+
+    def getvalue(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+class TextCache:
+    """
+    On-disk cache of extracted CV text keyed by the SHA-256 of the file content.
+    Least recently used entries are evicted once the cache exceeds max_bytes.
+    """
+    def __init__(self, directory=".cv_text_cache", max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = self.size_bytes()
+
+    @staticmethod
+    def key(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".txt")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        # Touch the entry so eviction sees it as recently used
+        os.utime(path)
+        self.hits += 1
+        return text
+
+    def put(self, key, text):
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if os.path.exists(path):
+            self._bytes -= os.path.getsize(path)
+        os.replace(tmp_path, path)
+        self._bytes += os.path.getsize(path)
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def size_bytes(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".txt"))
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        """
+        entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                   for entry in os.scandir(self.directory) if entry.name.endswith(".txt")]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes": self._bytes,
+        }
+
+def content_ids(files):
+    """
+    Stable identifier for each uploaded file: the SHA-256 of its content, with
+    a "#n" suffix on repeated copies so that every upload stays distinct
+    """
+    seen = {}
+    ids = []
+    for file in files:
+        key = TextCache.key(file.getvalue())
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        ids.append(key if n == 0 else f"{key}#{n}")
+    return ids
+
+def _extract_job(job):
+    """
+    Return (text, None) on success or (None, error message) for a file that
+    could not be parsed; one corrupt CV should not abort a whole batch
+    """
+    data, file_type = job
+    try:
+        return extract_text_from_bytes(data, file_type), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def extract_texts(files, cache=None, max_workers=None, min_parallel=8, pool=None):
+    """
+    Extract text from many uploaded files.
+
+    Cached results are returned without parsing; the remaining files are parsed
+    on a process pool (or serially when there are fewer than min_parallel).
+    An existing executor can be passed as pool to reuse it across calls.
+
+    Returns (texts, errors): files that failed to parse get "" in texts and an
+    (index, message) entry in errors, and are not cached, so they are retried
+    on the next call.
+    """
+    texts = [None] * len(files)
+    errors = []
+    pending = []
+    for i, file in enumerate(files):
+        data = file.getvalue()
+        key = TextCache.key(data) if cache is not None else None
+        text = cache.get(key) if cache is not None else None
+        if text is None:
+            pending.append((i, key, data, file.type))
+        else:
+            texts[i] = text
+
+    jobs = [(data, file_type) for _, _, data, file_type in pending]
+    if pool is not None and jobs:
+        results = list(pool.map(_extract_job, jobs, chunksize=4))
+    elif len(jobs) >= min_parallel:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_extract_job, jobs, chunksize=4))
+    else:
+        results = [_extract_job(job) for job in jobs]
+
+    for (i, key, _, _), (text, error) in zip(pending, results):
+        if error is not None:
+            texts[i] = ""
+            errors.append((i, error))
+            continue
+        texts[i] = text
+        if cache is not None:
+            cache.put(key, text)
+    return texts, errors
@@ -0,0 +1,134 @@
+import math
+import re
+from collections import defaultdict
+
+# Tokens keep "+", "#" and inner dots so C++, C# and Node.js stay whole words
+TOKEN_RE = re.compile(r"\w[\w+#]*(?:\.\w[\w+#]*)*")
+
+def tokenize(text):
+    """
+    Lowercase word tokens; keywords only ever match whole tokens
+    """
+    return TOKEN_RE.findall(text.lower())
+
+def keyword_tokens(keywords):
+    """
+    Map each non-empty keyword to its token tuple
+    """
+    result = {}
+    for keyword in keywords:
+        tokens = tuple(tokenize(keyword))
+        if tokens:
+            result[keyword] = tokens
+    return result
+
+def hit_column(keyword):
+    """
+    Leaderboard column for a keyword's hit count, namespaced so that a keyword
+    such as "Score" or "path" cannot overwrite a real column
+    """
+    return f"hits: {keyword}"
+
+class KeywordMatcher:
+    """
+    Compiled multi-keyword matcher. All keywords (including multi-word phrases)
+    are found in a single pass over the text tokens, on word boundaries, so
+    "R" does not match "Recruiter" and "Java" does not match "JavaScript".
+    """
+    def __init__(self, keywords):
+        self.keywords = keyword_tokens(keywords)
+        # first token -> [(keyword, token tuple)]
+        self.by_first = defaultdict(list)
+        for keyword, tokens in self.keywords.items():
+            self.by_first[tokens[0]].append((keyword, tokens))
+
+    def count(self, text):
+        """
+        Return {keyword: number of occurrences} for every keyword
+        """
+        counts = dict.fromkeys(self.keywords, 0)
+        tokens = tokenize(text)
+        for i, token in enumerate(tokens):
+            for keyword, kw_tokens in self.by_first.get(token, ()):
+                if len(kw_tokens) == 1 or tuple(tokens[i:i + len(kw_tokens)]) == kw_tokens:
+                    counts[keyword] += 1
+        return counts
+
+class InvertedIndex:
+    """
+    Positional inverted index over the CV corpus. Once the CVs are indexed a
+    new keyword list is scored from the postings without rescanning any text.
+    """
+    def __init__(self):
+        # token -> {doc_id: [positions]}
+        self.postings = defaultdict(dict)
+        self.n_docs = 0
+
+    def add(self, text):
+        """
+        Index a document and return its id
+        """
+        doc_id = self.n_docs
+        for position, token in enumerate(tokenize(text)):
+            self.postings[token].setdefault(doc_id, []).append(position)
+        self.n_docs += 1
+        return doc_id
+
+    def add_all(self, texts):
+        return [self.add(text) for text in texts]
+
+    def keyword_hits(self, tokens):
+        """
+        Return {doc_id: occurrences} for a keyword given as a token tuple
+        """
+        first = self.postings.get(tokens[0], {})
+        if len(tokens) == 1:
+            return {doc_id: len(positions) for doc_id, positions in first.items()}
+        hits = {}
+        for doc_id, positions in first.items():
+            # Phrase match: every following token must sit at the next position
+            following = []
+            for token in tokens[1:]:
+                doc_positions = self.postings.get(token, {}).get(doc_id)
+                if doc_positions is None:
+                    break
+                following.append(set(doc_positions))
+            else:
+                count = sum(1 for p in positions
+                            if all(p + k + 1 in s for k, s in enumerate(following)))
+                if count:
+                    hits[doc_id] = count
+        return hits
+
+    def weight(self, doc_freq):
+        """
+        Smoothed IDF: rare skills count more than ones every CV mentions
+        """
+        return math.log((self.n_docs + 1) / (doc_freq + 1)) + 1.0
+
+    def score(self, keywords):
+        """
+        Score every indexed CV against a keyword list.
+
+        Returns one dict per document with per-keyword hit counts, the number of
+        matched keywords and an IDF-weighted score with sublinear term frequency.
+        """
+        results = [{"hits": {}, "matched": 0, "weighted": 0.0} for _ in range(self.n_docs)]
+        for keyword, tokens in keyword_tokens(keywords).items():
+            hits = self.keyword_hits(tokens)
+            weight = self.weight(len(hits))
+            for result in results:
+                result["hits"][keyword] = 0
+            for doc_id, count in hits.items():
+                result = results[doc_id]
+                result["hits"][keyword] = count
+                result["matched"] += 1
+                result["weighted"] += weight * (1.0 + math.log(count))
+        return results
+
+    def keyword_weights(self, keywords):
+        """
+        Return {keyword: IDF weight} for a keyword list
+        """
+        return {keyword: self.weight(len(self.keyword_hits(tokens)))
+                for keyword, tokens in keyword_tokens(keywords).items()}
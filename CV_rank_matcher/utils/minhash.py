@@ -0,0 +1,123 @@
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from utils.keyword_index import tokenize
+
+def shingles(text, size=3):
+    """
+    Hash word n-grams of a text to 32-bit integers (crc32 is stable across processes)
+    """
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams),
+                                 dtype=np.uint64, count=len(grams)))
+
+class MinHashLSH:
+    """
+    MinHash signatures with LSH banding over CV texts.
+
+    Each signature is split into bands; CVs that share any band bucket become
+    candidate pairs, so top-k and near-duplicate queries only compare
+    candidates instead of all n^2 pairs. Documents with no shingles (empty or
+    unparsable text) get a placeholder signature but are never bucketed, so
+    they are not reported as similar to each other or to anything else.
+    """
+    def __init__(self, num_perm=128, bands=32, shingle_size=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family: ((a * x + b) mod 2^64) >> 32, a odd
+        self.a = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self.signatures = []
+        self.empty = set()
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+
+    def signature(self, text):
+        return self._signature(shingles(text, self.shingle_size))
+
+    def _signature(self, hashes):
+        if hashes.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        with np.errstate(over="ignore"):
+            permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def add(self, text):
+        """
+        Index a document and return its id
+        """
+        doc_id = len(self.signatures)
+        hashes = shingles(text, self.shingle_size)
+        sig = self._signature(hashes)
+        self.signatures.append(sig)
+        if hashes.size == 0:
+            self.empty.add(doc_id)
+            return doc_id
+        for band in range(self.bands):
+            key = sig[band * self.rows:(band + 1) * self.rows].tobytes()
+            self.buckets[band][key].append(doc_id)
+        return doc_id
+
+    def add_all(self, texts):
+        return [self.add(text) for text in texts]
+
+    def jaccard(self, i, j):
+        """
+        Estimated Jaccard similarity of the shingle sets of documents i and j
+        """
+        return float(np.mean(self.signatures[i] == self.signatures[j]))
+
+    def candidates(self, doc_id):
+        if doc_id in self.empty:
+            return set()
+        sig = self.signatures[doc_id]
+        found = set()
+        for band in range(self.bands):
+            key = sig[band * self.rows:(band + 1) * self.rows].tobytes()
+            found.update(self.buckets[band].get(key, ()))
+        found.discard(doc_id)
+        return found
+
+    def top_k(self, doc_id, k=5):
+        """
+        Return [(other_id, estimated Jaccard)] for the k most similar candidates
+        """
+        scored = [(other, self.jaccard(doc_id, other)) for other in self.candidates(doc_id)]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:k]
+
+    def near_duplicate_clusters(self, threshold=0.8):
+        """
+        Group documents whose estimated Jaccard similarity reaches threshold.
+        Returns clusters of two or more document ids.
+        """
+        parent = list(range(len(self.signatures)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for band_buckets in self.buckets:
+            for members in band_buckets.values():
+                for pos, i in enumerate(members):
+                    for j in members[pos + 1:]:
+                        root_i, root_j = find(i), find(j)
+                        if root_i != root_j and self.jaccard(i, j) >= threshold:
+                            parent[root_j] = root_i
+
+        clusters = defaultdict(list)
+        for doc_id in range(len(parent)):
+            clusters[find(doc_id)].append(doc_id)
+        return [members for members in clusters.values() if len(members) > 1]
@@ -1,3 +1,7 @@
+import bisect
+import math
+import random
+
 import trueskill
 
 # Initialize TrueSkill environment
@@ -18,3 +22,156 @@ def compare_pair(text1_score, text2_score):
         winner = "CV2"
     
     return winner, rating1, rating2
+
+def round_robin_rounds(players):
+    """
+    Split all pairings into rounds (circle method) so that every player
+    appears at most once per round
+    """
+    players = list(players)
+    if len(players) % 2:
+        players.append(None)
+    n = len(players)
+    rounds = []
+    for _ in range(n - 1):
+        pairs = [(players[i], players[n - 1 - i]) for i in range(n // 2)]
+        rounds.append([(a, b) for a, b in pairs if a is not None and b is not None])
+        players = [players[0], players[-1]] + players[1:-1]
+    return rounds
+
+class Tournament:
+    """
+    TrueSkill tournament with persistent ratings for every CV.
+
+    Small pools play a full round robin, large pools play Swiss rounds (players
+    paired with neighbours of similar rating), so the number of matches grows
+    as O(n log n) instead of O(n^2). Each round is a matching, so all of its
+    results are computed from the same rating snapshot and applied as a batch.
+    New CVs are placed with Swiss rounds against the existing pool only,
+    without replaying earlier matches.
+    """
+    def __init__(self, round_robin_limit=16, rounds=None, seed=None):
+        self.round_robin_limit = round_robin_limit
+        self.rounds = rounds
+        self.random = random.Random(seed)
+        self.scores = {}
+        self.ratings = {}
+        self.played = set()
+        self.matches = 0
+
+    def add(self, name, score):
+        self.scores[name] = score
+        if name not in self.ratings:
+            self.ratings[name] = env.create_rating()
+
+    def remove(self, names):
+        """
+        Drop players (and their match history) that are no longer in the pool
+        """
+        names = set(names)
+        for name in names:
+            self.scores.pop(name, None)
+            self.ratings.pop(name, None)
+        self.played = {pair for pair in self.played if not pair & names}
+
+    def _n_rounds(self, n):
+        if self.rounds is not None:
+            return self.rounds
+        return math.ceil(math.log2(max(n, 2))) + 2
+
+    def _play_batch(self, pairs):
+        """
+        Rate a batch of matches in which no player appears twice
+        """
+        updates = {}
+        for a, b in pairs:
+            self.played.add(frozenset((a, b)))
+            if self.scores[a] == self.scores[b]:
+                continue
+            winner, loser = (a, b) if self.scores[a] > self.scores[b] else (b, a)
+            updates[winner], updates[loser] = env.rate_1vs1(self.ratings[winner], self.ratings[loser])
+            self.matches += 1
+        self.ratings.update(updates)
+
+    def _by_rating(self, players):
+        # Random tie-break so the first Swiss round is a sampled pairing
+        return sorted(players, key=lambda p: (-self.ratings[p].mu, self.random.random()))
+
+    def _swiss_round(self, players):
+        pairs = []
+        unpaired = self._by_rating(players)
+        while len(unpaired) > 1:
+            a = unpaired.pop(0)
+            for i, b in enumerate(unpaired):
+                if frozenset((a, b)) not in self.played:
+                    break
+            else:
+                i = 0
+            pairs.append((a, unpaired.pop(i)))
+        return pairs
+
+    def run(self):
+        """
+        Rank the whole pool from its current ratings
+        """
+        players = list(self.scores)
+        if len(players) <= self.round_robin_limit:
+            for pairs in round_robin_rounds(players):
+                self._play_batch(pairs)
+        else:
+            for _ in range(self._n_rounds(len(players))):
+                self._play_batch(self._swiss_round(players))
+        return self.leaderboard()
+
+    def add_and_rank(self, new_scores):
+        """
+        Add new CVs ({name: score}) and place them against the existing pool
+        """
+        existing = [p for p in self.ratings if p not in new_scores]
+        for name, score in new_scores.items():
+            self.add(name, score)
+        new = list(new_scores)
+        if not existing:
+            return self.run()
+        for _ in range(self._n_rounds(len(existing))):
+            available = sorted(existing, key=lambda p: self.ratings[p].mu)
+            mus = [self.ratings[p].mu for p in available]
+            pairs = []
+            for a in self._by_rating(new):
+                if not available:
+                    break
+                b = self._closest_opponent(a, available, mus)
+                pairs.append((a, b))
+            self._play_batch(pairs)
+        return self.leaderboard()
+
+    def _closest_opponent(self, a, available, mus, max_scan=8):
+        """
+        Pop the closest-rated opponent from the mu-sorted pool, preferring
+        one that a has not played yet
+        """
+        mu = self.ratings[a].mu
+        i = bisect.bisect_left(mus, mu)
+        lo, hi = i - 1, i
+        best = None
+        for _ in range(max_scan):
+            if lo < 0 and hi >= len(available):
+                break
+            if hi >= len(available) or (lo >= 0 and mu - mus[lo] <= mus[hi] - mu):
+                j, lo = lo, lo - 1
+            else:
+                j, hi = hi, hi + 1
+            if best is None:
+                best = j
+            if frozenset((a, available[j])) not in self.played:
+                best = j
+                break
+        mus.pop(best)
+        return available.pop(best)
+
+    def leaderboard(self):
+        """
+        Return [(name, conservative rating, mu, sigma)] best first
+        """
+        rows = [(name, env.expose(r), r.mu, r.sigma) for name, r in self.ratings.items()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
@@ -1,5 +1,6 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from utils.keyword_index import KeywordMatcher
 
 def compute_similarity(text1, text2):
     """
@@ -9,13 +10,48 @@ def compute_similarity(text1, text2):
     vectors = vectorizer.fit_transform([text1, text2])
     return cosine_similarity(vectors)[0,1]
 
+class CorpusSimilarity:
+    """
+    Corpus-level TF-IDF similarity engine.
+
+    The vocabulary and IDF weights are fitted once over all CVs and the
+    document-term matrix stays sparse. TF-IDF rows are L2-normalised, so the
+    cosine similarity matrix is a single sparse product X @ X.T.
+    """
+    def __init__(self, texts, block_size=1024, **vectorizer_kwargs):
+        self.block_size = block_size
+        self.vectorizer = TfidfVectorizer(**vectorizer_kwargs)
+        self.matrix = self.vectorizer.fit_transform(texts).tocsr()
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def similarity(self, i, j):
+        """
+        Cosine similarity between documents i and j
+        """
+        return float(self.matrix[i].multiply(self.matrix[j]).sum())
+
+    def blocks(self):
+        """
+        Yield (start, dense block of rows start:start+block_size) of the
+        similarity matrix, so large corpora never need the full n x n array
+        """
+        n = len(self)
+        for start in range(0, n, self.block_size):
+            stop = min(start + self.block_size, n)
+            block = self.matrix[start:stop] @ self.matrix.T
+            yield start, block.toarray()
+
+    def full_matrix(self):
+        """
+        Dense n x n cosine similarity matrix in one sparse product
+        """
+        return (self.matrix @ self.matrix.T).toarray()
+
 def skill_score(text, keywords):
     """
     Count keyword matches in text for a simple skill score
     """
-    score = 0
-    text_lower = text.lower()
-    for word in keywords:
-        if word.lower() in text_lower:
-            score += 1
-    return score
+    counts = KeywordMatcher(keywords).count(text)
+    return sum(1 for count in counts.values() if count > 0)
@@ -0,0 +1,58 @@
+"""
+Characters/sec for 500-character generations: re-running the 40-step window
+for every character (the previous generate_text) vs the stateful decoder.
+
+Usage:
+    python bench_generation.py [--keras]
+"""
+import sys
+import time
+
+import numpy as np
+
+from numpy_lstm import StatefulDecoder, load_serving_model
+
+MODEL_PATH = "textgenerator.h5"
+LENGTH = 500
+SEQ_LENGTH = 40
+
+def window_generate(model, seed, vocab):
+    indices = list(seed)
+    for _ in range(LENGTH):
+        x = np.zeros((1, SEQ_LENGTH, vocab), dtype=np.float32)
+        x[0, np.arange(SEQ_LENGTH), indices[-SEQ_LENGTH:]] = 1
+        indices.append(int(np.argmax(model.predict(x, verbose=0)[0])))
+    return indices[len(seed):]
+
+def stateful_generate(decoder, seed):
+    decoder.reset()
+    for index in seed:
+        preds = decoder.step(index)
+    out = []
+    for _ in range(LENGTH):
+        out.append(int(np.argmax(preds[0])))
+        preds = decoder.step(out[-1])
+    return out
+
+def main():
+    backend = "keras" if "--keras" in sys.argv else "numpy"
+    model = load_serving_model(MODEL_PATH, backend)
+    decoder = StatefulDecoder(model, {})
+    vocab = decoder.model.dense_bias.shape[0]
+    seed = np.random.default_rng(0).integers(0, vocab, SEQ_LENGTH).tolist()
+
+    started = time.perf_counter()
+    window = window_generate(model, seed, vocab)
+    window_cps = LENGTH / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    stateful = stateful_generate(decoder, seed)
+    stateful_cps = LENGTH / (time.perf_counter() - started)
+
+    print(f"backend:  {backend}")
+    print(f"window:   {window_cps:10.1f} chars/sec")
+    print(f"stateful: {stateful_cps:10.1f} chars/sec ({stateful_cps / window_cps:.1f}x)")
+    print(f"same first character: {window[0] == stateful[0]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Cold-start comparison of the numpy and keras serving backends.
+
+Each backend runs in a fresh interpreter that loads textgenerator.h5 and
+predicts one window; wall time and peak RSS of that process are reported.
+
+Usage:
+    python bench_startup.py
+"""
+import json
+import subprocess
+import sys
+
+CHILD = """
+import json, resource, time
+start = time.perf_counter()
+import numpy as np
+from numpy_lstm import load_serving_model
+model = load_serving_model("textgenerator.h5", {backend!r})
+x = np.zeros((1, 40, 65), dtype=np.float32)
+x[0, np.arange(40), 0] = 1
+model.predict(x, verbose=0)
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+def measure(backend):
+    out = subprocess.run([sys.executable, "-c", CHILD.format(backend=backend)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    print(f"{'backend':<8} {'startup (s)':>12} {'peak RSS (MB)':>14}")
+    for backend in ("numpy", "keras"):
+        try:
+            result = measure(backend)
+        except subprocess.CalledProcessError as e:
+            print(f"{backend:<8} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{backend:<8} {result['seconds']:>12.2f} {result['max_rss_mb']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
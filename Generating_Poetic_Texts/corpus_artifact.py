@@ -0,0 +1,106 @@
+"""
+Vocabulary + integer-encoded corpus stored next to a model file.
+
+    textgenerator.vocab.json   format version, characters, corpus metadata
+    textgenerator.corpus.npy   uint8/uint16 corpus codes, opened memory-mapped
+
+Serving only needs the vocabulary, so startup reads one small JSON file and
+never touches the network or the raw text.
+
+Usage:
+    python corpus_artifact.py my_poems.txt --model my_poems.h5
+"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from data_pipeline import encode_corpus
+
+FORMAT_VERSION = 1
+
+def vocab_path(model_path):
+    return Path(model_path).with_suffix(".vocab.json")
+
+def corpus_path(model_path):
+    return Path(model_path).with_suffix(".corpus.npy")
+
+def read_corpus_file(path):
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8")
+
+def build_artifact(text, model_path, source=None, expected_size=None):
+    """
+    Encode text and write the vocabulary and corpus for model_path.
+    Returns (characters, memory-mapped codes).
+
+    With expected_size (the model's output width), a corpus whose vocabulary
+    has a different size raises ValueError before anything is written.
+    """
+    characters, codes = encode_corpus(text)
+    if expected_size is not None and len(characters) != expected_size:
+        raise ValueError(f"Corpus has {len(characters)} distinct characters but {model_path} "
+                         f"predicts {expected_size}; it is not the text the model was trained on.")
+    npy_path = corpus_path(model_path)
+    tmp_npy = npy_path.with_name("tmp_" + npy_path.name)
+    np.save(tmp_npy, codes)
+    os.replace(tmp_npy, npy_path)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "characters": characters,
+        "vocab_sha256": hashlib.sha256("".join(characters).encode("utf-8")).hexdigest(),
+        "corpus": {
+            "file": npy_path.name,
+            "source": str(source) if source else None,
+            "length": int(len(codes)),
+            "dtype": str(codes.dtype),
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        },
+    }
+    json_path = vocab_path(model_path)
+    tmp_json = json_path.with_name("tmp_" + json_path.name)
+    with open(tmp_json, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_json, json_path)
+    return characters, load_corpus_codes(model_path)
+
+def load_artifact(model_path):
+    """
+    Artifact metadata for model_path, or None if missing or written by another format version
+    """
+    path = vocab_path(model_path)
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        return None
+    return meta
+
+def load_vocab(model_path):
+    meta = load_artifact(model_path)
+    return meta["characters"] if meta else None
+
+def load_corpus_codes(model_path):
+    """
+    Memory-mapped corpus codes, or None when only the vocabulary was shipped
+    """
+    path = corpus_path(model_path)
+    return np.load(path, mmap_mode="r") if path.exists() else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the vocabulary/corpus artifact for a text model")
+    parser.add_argument("corpus", help="UTF-8 text file")
+    parser.add_argument("--model", default="textgenerator.h5", help="model file the artifact belongs to")
+    args = parser.parse_args()
+
+    characters, codes = build_artifact(read_corpus_file(args.corpus), args.model, source=args.corpus)
+    print(f"{len(characters)} characters, {len(codes)} codes -> "
+          f"{vocab_path(args.model)}, {corpus_path(args.model)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import numpy as np
+
+def encode_corpus(text):
+    """
+    Integer-encode a corpus in one vectorized pass.
+    Returns (characters, codes): the sorted vocabulary and a compact index array.
+    """
+    codepoints = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    unique, codes = np.unique(codepoints, return_inverse=True)
+    characters = [chr(c) for c in unique]
+    dtype = np.uint8 if len(characters) <= 256 else np.uint16
+    return characters, codes.astype(dtype)
+
+def sliding_windows(codes, seq_length):
+    """
+    Zero-copy (n_windows, seq_length) view of the corpus plus the next-character labels
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(codes[:-1], seq_length)
+    labels = codes[seq_length:]
+    return windows, labels
+
+def one_hot(indices, vocab_size):
+    return np.eye(vocab_size, dtype=np.float32)[indices]
+
+class WindowBatches:
+    """
+    Batches of (one-hot windows, sparse labels) drawn from an integer corpus.
+
+    Only the current batch is ever expanded to one-hot, so memory is
+    batch_size * seq_length * vocab_size floats regardless of corpus size.
+    """
+    def __init__(self, codes, seq_length, vocab_size, batch_size=256, step=1, shuffle=True, seed=None):
+        self.windows, self.labels = sliding_windows(codes, seq_length)
+        self.starts = np.arange(0, len(self.labels), step)
+        self.vocab_size = vocab_size
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return -(-len(self.starts) // self.batch_size)
+
+    def epoch(self):
+        order = self.rng.permutation(self.starts) if self.shuffle else self.starts
+        for offset in range(0, len(order), self.batch_size):
+            rows = order[offset:offset + self.batch_size]
+            yield one_hot(self.windows[rows], self.vocab_size), self.labels[rows].astype(np.int32)
+
+    def __iter__(self):
+        # Endless stream for model.fit(..., steps_per_epoch=len(batches))
+        while True:
+            yield from self.epoch()
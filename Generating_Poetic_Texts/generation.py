@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+
+from generation_metrics import RequestTimer
+from numpy_lstm import StatefulDecoder
+
+def _per_row(value, n, dtype):
+    """
+    Broadcast a scalar or per-candidate setting to one value per row
+    """
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (n,))
+
+def sample_batch(preds, temperature=1.0, top_k=None, top_p=None, rng=None):
+    """
+    Draw one index per row of preds (n, vocab) with temperature, top-k and
+    nucleus (top-p) filtering applied to all rows at once.
+    temperature, top_k and top_p may be scalars or one value per row.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    preds = np.atleast_2d(np.asarray(preds, dtype=np.float64))
+    n, vocab = preds.shape
+
+    logits = np.log(np.maximum(preds, 1e-12)) / _per_row(temperature, n, np.float64)[:, None]
+    # Sort every row once (descending); both filters are prefixes of this order
+    order = np.argsort(-logits, axis=1)
+    logits = np.take_along_axis(logits, order, axis=1)
+    probs = np.exp(logits - logits[:, :1])
+    probs /= probs.sum(axis=1, keepdims=True)
+
+    keep = np.ones((n, vocab), dtype=bool)
+    if top_k is not None:
+        k = _per_row(top_k, n, np.int64)
+        k = np.where(k > 0, k, vocab)
+        keep &= np.arange(vocab) < k[:, None]
+    if top_p is not None:
+        p = _per_row(top_p, n, np.float64)
+        # Keep the smallest prefix whose mass reaches p (the top token always survives)
+        keep &= (np.cumsum(probs, axis=1) - probs) < p[:, None]
+
+    probs = np.where(keep, probs, 0.0)
+    cdf = np.cumsum(probs, axis=1)
+    draws = rng.random(n) * cdf[:, -1]
+    picks = np.minimum((cdf <= draws[:, None]).sum(axis=1), vocab - 1)
+    return order[np.arange(n), picks]
+
+def generate_batch(model, seeds, length, temperature, char_to_index, index_to_char,
+                   top_k=None, top_p=None, seq_length=40, rng=None, cache=None):
+    """
+    Generate len(seeds) candidates together: one batched LSTM step per
+    character for the whole batch. temperature/top_k/top_p may differ per candidate.
+    cache is an optional PrefixStateCache for the seed states; it is keyed on
+    the last seq_length characters of each seed, which is what the model sees.
+    """
+    decoder = StatefulDecoder(model, char_to_index, cache=cache)
+    preds = decoder.feed_batch([seed[-seq_length:] for seed in seeds])
+    chars = np.empty((len(seeds), length), dtype=object)
+    for t in range(length):
+        indices = sample_batch(preds, temperature, top_k, top_p, rng)
+        chars[:, t] = [index_to_char[i] for i in indices]
+        preds = decoder.step(indices)
+    return [seed + "".join(row) for seed, row in zip(seeds, chars)]
+
+def stream_text(model, seed, length, temperature, char_to_index, index_to_char,
+                top_k=None, top_p=None, seq_length=40, chunk_size=1, rng=None, on_done=None, cache=None):
+    """
+    Yield generated text in chunks of chunk_size characters as soon as they are
+    sampled. When the stream finishes, on_done receives the request's metrics
+    (see RequestTimer.record).
+    """
+    timer = RequestTimer(length)
+    decoder = StatefulDecoder(model, char_to_index, cache=cache)
+    preds = decoder.feed(seed[-seq_length:])
+    chunk = []
+    for t in range(length):
+        step_started = time.perf_counter()
+        index = sample_batch(preds, temperature, top_k, top_p, rng)[0]
+        chunk.append(index_to_char[index])
+        if len(chunk) >= chunk_size or t == length - 1:
+            timer.emitted()
+            step_time = time.perf_counter() - step_started
+            yield "".join(chunk)
+            chunk = []
+            step_started = time.perf_counter()
+        else:
+            step_time = 0.0
+        if t < length - 1:
+            preds = decoder.step(index)
+        timer.step(step_time + time.perf_counter() - step_started)
+    if on_done is not None:
+        on_done(timer.record(seed_chars=len(seed), temperature=float(temperature)))
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+METRICS_FILE = "generation_metrics.jsonl"
+
+def model_version(path):
+    """
+    Short content hash of a model file, so metrics from different weights stay apart
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+class RequestTimer:
+    """
+    Latency of one streamed generation: time to first character, per-step
+    model latency (sample + LSTM step, excluding time spent by the consumer)
+    and end-to-end characters/sec.
+    """
+    def __init__(self, length):
+        self.started = time.perf_counter()
+        self.first_char = None
+        self.steps = np.empty(length)
+        self.count = 0
+
+    def step(self, seconds):
+        self.steps[self.count] = seconds
+        self.count += 1
+
+    def emitted(self):
+        if self.first_char is None:
+            self.first_char = time.perf_counter() - self.started
+
+    def record(self, **fields):
+        total = time.perf_counter() - self.started
+        steps = self.steps[:self.count] * 1000
+        return {
+            **fields,
+            "timestamp": time.time(),
+            "chars": self.count,
+            "ttfc_ms": (self.first_char or total) * 1000,
+            "step_p50_ms": float(np.percentile(steps, 50)) if self.count else 0.0,
+            "step_p95_ms": float(np.percentile(steps, 95)) if self.count else 0.0,
+            "chars_per_sec": self.count / total if total else 0.0,
+            "total_s": total,
+        }
+
+class GenerationLog:
+    """
+    Recent per-request generation metrics, kept in memory and appended to a JSONL
+    file so runs of different model versions can be compared later
+    """
+    def __init__(self, path=METRICS_FILE, maxlen=1000):
+        self.path = path
+        self.records = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def summary(self):
+        """
+        One row per model version: request count, median TTFC / step latency and mean chars/sec
+        """
+        with self._lock:
+            records = list(self.records)
+        by_version = {}
+        for record in records:
+            by_version.setdefault(record.get("model_version"), []).append(record)
+        rows = []
+        for version, group in by_version.items():
+            rows.append({
+                "model_version": version,
+                "requests": len(group),
+                "ttfc_ms_p50": float(np.median([r["ttfc_ms"] for r in group])),
+                "step_ms_p50": float(np.median([r["step_p50_ms"] for r in group])),
+                "step_ms_p95": float(np.median([r["step_p95_ms"] for r in group])),
+                "chars_per_sec": float(np.mean([r["chars_per_sec"] for r in group])),
+            })
+        return rows
+
+_log = None
+_log_lock = threading.Lock()
+
+def get_generation_log():
+    """
+    Process-wide GenerationLog shared by every session
+    """
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = GenerationLog()
+        return _log
@@ -1,72 +1,78 @@
 import os
+import urllib.request
 import numpy as np
 import streamlit as st
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Activation
-from tensorflow.keras.optimizers import RMSprop
+from numpy_lstm import CharLSTM, load_serving_model, output_size
+from corpus_artifact import build_artifact, load_vocab, read_corpus_file, vocab_path
+from data_pipeline import WindowBatches
+from generation import generate_batch, stream_text
+from generation_metrics import get_generation_log, model_version
+from prefix_cache import PrefixStateCache
 
-MODEL_PATH = "textgenerator.h5"
+MODEL_PATH = os.environ.get("MODEL_PATH", "textgenerator.h5")
+CORPUS_URL = "https://storage.googleapis.com/download.tensorflow.org/data/shakespeare.txt"
+# Optional local UTF-8 corpus to train on instead of downloading Shakespeare
+CORPUS_PATH = os.environ.get("CORPUS_PATH")
+# "numpy" serves the saved weights without importing TensorFlow, "keras" loads the full model
+SERVING_BACKEND = os.environ.get("SERVING_BACKEND", "numpy")
 
 
 # ----------------------------------
-# 1) Utility: Sampling Function
+# 1) Load or Train Model
 # ----------------------------------
-def sample(preds, temperature=1.0):
-    preds = np.asarray(preds).astype("float64")
-    preds = np.log(preds) / temperature
-    exp_preds = np.exp(preds)
-    preds = exp_preds / np.sum(exp_preds)
-    return np.random.choice(len(preds), p=preds)
+def load_corpus(path=None):
+    if path:
+        return read_corpus_file(path)
+    # Same cache location as tf.keras.utils.get_file, without importing TensorFlow
+    filepath = os.path.join(os.path.expanduser("~"), ".keras", "datasets", "shakespeare.txt")
+    if not os.path.exists(filepath):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        urllib.request.urlretrieve(CORPUS_URL, filepath)
+    return open(filepath, 'rb').read().decode('utf-8')
 
 
-# ----------------------------------
-# 2) Load or Train Model
-# ----------------------------------
 @st.cache_resource
 def load_or_train_model():
     if os.path.exists(MODEL_PATH):
         st.info("📌 Saved model found. Loading model...")
-        model = load_model(MODEL_PATH)
-
-        link = "https://storage.googleapis.com/download.tensorflow.org/data/shakespeare.txt"
-        filepath = tf.keras.utils.get_file("shakespeare.txt", link)
-        text = open(filepath, 'rb').read().decode('utf-8')
-
-        characters = sorted(set(text))
+        model = load_serving_model(MODEL_PATH, SERVING_BACKEND)
+
+        # The vocabulary artifact next to the model avoids downloading and decoding
+        # the corpus; it is only built from the text if it is missing.
+        characters = load_vocab(MODEL_PATH)
+        if characters is None:
+            # Checked before the artifact is written, so a wrong corpus leaves nothing behind
+            characters, _ = build_artifact(load_corpus(CORPUS_PATH), MODEL_PATH, CORPUS_PATH or CORPUS_URL,
+                                           expected_size=output_size(model))
+        elif len(characters) != output_size(model):
+            # A vocabulary from another corpus would decode the model's outputs as garbage.
+            # Raising keeps st.cache_resource from caching the broken model.
+            raise ValueError(f"Vocabulary has {len(characters)} characters but {MODEL_PATH} predicts "
+                             f"{output_size(model)}. Set CORPUS_PATH to the text the model was trained on, "
+                             f"and remove {vocab_path(MODEL_PATH)}.")
         char_to_index = {c: i for i, c in enumerate(characters)}
         index_to_char = {i: c for i, c in enumerate(characters)}
 
-        return model, char_to_index, index_to_char, characters, text
+        return model, char_to_index, index_to_char, characters
 
     else:
         st.warning("⚠️ No saved model found. Training a new model... This may take 3–5 minutes.")
 
-        link = "https://storage.googleapis.com/download.tensorflow.org/data/shakespeare.txt"
-        filepath = tf.keras.utils.get_file("shakespeare.txt", link)
-        text = open(filepath, 'rb').read().decode('utf-8')
+        # TensorFlow is only needed when training
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Activation
+        from tensorflow.keras.optimizers import RMSprop
 
-        characters = sorted(set(text))
+        # The corpus is stored once as a memory-mapped integer array next to the
+        # model; windows are strided views of it and only the current batch is
+        # expanded to one-hot.
+        characters, codes = build_artifact(load_corpus(CORPUS_PATH), MODEL_PATH, CORPUS_PATH or CORPUS_URL)
         char_to_index = {c: i for i, c in enumerate(characters)}
         index_to_char = {i: c for i, c in enumerate(characters)}
 
         SEQ_LENGTH = 40
         STEP_SIZE = 1
-
-        sentences = []
-        next_chars = []
-
-        for i in range(0, len(text) - SEQ_LENGTH, STEP_SIZE):
-            sentences.append(text[i:i + SEQ_LENGTH])
-            next_chars.append(text[i + SEQ_LENGTH])
-
-        x = np.zeros((len(sentences), SEQ_LENGTH, len(characters)), dtype=bool)
-        y = np.zeros((len(sentences), len(characters)), dtype=bool)
-
-        for i, sentence in enumerate(sentences):
-            for t, char in enumerate(sentence):
-                x[i, t, char_to_index[char]] = True
-            y[i, char_to_index[next_chars[i]]] = True
+        batches = WindowBatches(codes, SEQ_LENGTH, len(characters), batch_size=256, step=STEP_SIZE)
 
         # Build model
         model = Sequential()
@@ -74,49 +80,42 @@ def load_or_train_model():
         model.add(Dense(len(characters)))
         model.add(Activation('softmax'))
 
-        model.compile(loss="categorical_crossentropy",
+        model.compile(loss="sparse_categorical_crossentropy",
                       optimizer=RMSprop(learning_rate=0.01))
 
-        model.fit(x, y, batch_size=256, epochs=4)
+        model.fit(iter(batches), steps_per_epoch=len(batches), epochs=4)
 
-        model.save("textgenerator.h5", include_optimizer=False)
+        model.save(MODEL_PATH, include_optimizer=False)
         st.success("✅ Model trained and saved successfully.")
 
-        return model, char_to_index, index_to_char, characters, text
+        if SERVING_BACKEND == "numpy":
+            model = CharLSTM.from_keras(model)
+
+        return model, char_to_index, index_to_char, characters
 
 
 # ----------------------------------
-# 3) Text Generation Function
+# 2) Model Version and Seed-State Cache
 # ----------------------------------
-def generate_text(model, seed, length, temperature, char_to_index, index_to_char, SEQ_LENGTH=40):
-    generated = seed
-
-    for _ in range(length):
-        x_pred = np.zeros((1, SEQ_LENGTH, len(char_to_index)))
-        seed_cut = seed[-SEQ_LENGTH:]
-
-        for t, char in enumerate(seed_cut):
-            if char in char_to_index:
-                x_pred[0, t, char_to_index[char]] = 1
-
-        preds = model.predict(x_pred, verbose=0)[0]
-        next_index = sample(preds, temperature)
-        next_char = index_to_char[next_index]
+@st.cache_resource
+def current_model_version(path, mtime):
+    return model_version(path)
 
-        generated += next_char
-        seed += next_char
 
-    return generated
+@st.cache_resource
+def get_prefix_cache(version):
+    # Seed states are only valid for the weights they were computed with
+    return PrefixStateCache(max_bytes=16 * 1024 * 1024)
 
 
 # ----------------------------------
-# 4) Streamlit UI
+# 3) Streamlit UI
 # ----------------------------------
 st.title("📝 LSTM Shakespeare Text Generator")
 st.write("If a model exists, it will be loaded. Otherwise, a new one will be trained automatically.")
 
 # Load or train model
-model, char_to_index, index_to_char, characters, text = load_or_train_model()
+model, char_to_index, index_to_char, characters = load_or_train_model()
 
 # User inputs
 seed_text = st.text_input("Enter a seed sentence:", "To be, or not to be, that is the ")
@@ -129,7 +128,49 @@ temperature = temperature_dict[temp_option]
 
 st.write(f"⚡ Temperature set to {temperature} ({temp_option})")
 
+variants = st.slider("Number of variants", 1, 8, 1)
+with st.expander("Sampling options"):
+    spread = st.checkbox("Spread temperatures across variants (0.3 – 1.0)", value=False)
+    top_k = st.number_input("Top-k (0 = off)", min_value=0, max_value=len(characters), value=0)
+    top_p = st.slider("Nucleus top-p (1.0 = off)", 0.05, 1.0, 1.0)
+
 if st.button("Generate Text"):
-    output = generate_text(model, seed_text, length, temperature, char_to_index, index_to_char)
+    version = current_model_version(MODEL_PATH, os.path.getmtime(MODEL_PATH))
+    sampling = {"top_k": top_k or None, "top_p": top_p if top_p < 1.0 else None,
+                "cache": get_prefix_cache(version)}
     st.subheader("🔮 Generated Text:")
-    st.write(output)
+    if variants == 1:
+        # Render characters as they are sampled instead of after the whole sequence
+        metrics = {}
+
+        def on_done(record):
+            record["model_version"] = version
+            get_generation_log().add(record)
+            metrics.update(record)
+
+        placeholder = st.empty()
+        output = seed_text
+        for chunk in stream_text(model, seed_text, length, temperature, char_to_index, index_to_char,
+                                 chunk_size=8, on_done=on_done, **sampling):
+            output += chunk
+            placeholder.write(output)
+        st.caption(f"First character {metrics['ttfc_ms']:.0f} ms · "
+                   f"step p50 {metrics['step_p50_ms']:.2f} ms / p95 {metrics['step_p95_ms']:.2f} ms · "
+                   f"{metrics['chars_per_sec']:.0f} chars/sec")
+    else:
+        temperatures = np.linspace(0.3, 1.0, variants) if spread else temperature
+        # All variants step through the LSTM together: one batched forward pass per character
+        outputs = generate_batch(model, [seed_text] * variants, length, temperatures,
+                                 char_to_index, index_to_char, **sampling)
+        temps = np.broadcast_to(temperatures, (variants,))
+        for tab, output, t in zip(st.tabs([f"Variant {i + 1}" for i in range(variants)]), outputs, temps):
+            with tab:
+                st.caption(f"Temperature {t:.2f}")
+                st.write(output)
+
+with st.expander("📈 Generation performance"):
+    st.dataframe(get_generation_log().summary())
+    cache_stats = get_prefix_cache(current_model_version(MODEL_PATH, os.path.getmtime(MODEL_PATH))).stats()
+    st.caption(f"Seed-state cache: {cache_stats['entries']} entries, {cache_stats['bytes'] / 1024:.1f} KB, "
+               f"hit rate {cache_stats['hit_rate']:.0%} ({cache_stats['prefix_hits']} prefix hits), "
+               f"{cache_stats['chars_saved']} seed characters skipped")
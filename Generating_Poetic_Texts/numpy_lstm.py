@@ -0,0 +1,175 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# The NumPy Keras runtime is shared with the other apps from the repository root
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from common.numpy_keras import ACTIVATIONS, lstm_step, read_h5, softmax
+
+class CharLSTM:
+    """
+    NumPy-only inference for the LSTM -> Dense -> softmax character model.
+    Same predict() contract as the Keras model: one-hot windows in,
+    next-character probabilities out.
+    """
+    def __init__(self, kernel, recurrent_kernel, bias, dense_kernel, dense_bias,
+                 activation="tanh", recurrent_activation="sigmoid"):
+        self.kernel = np.asarray(kernel, dtype=np.float32)
+        self.recurrent_kernel = np.asarray(recurrent_kernel, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.dense_kernel = np.asarray(dense_kernel, dtype=np.float32)
+        self.dense_bias = np.asarray(dense_bias, dtype=np.float32)
+        self.units = self.recurrent_kernel.shape[0]
+        self.activation = ACTIVATIONS[activation]
+        self.recurrent_activation = ACTIVATIONS[recurrent_activation]
+
+    @classmethod
+    def from_h5(cls, path):
+        """
+        Read the LSTM and Dense weights from a Keras .h5 file with h5py (no TensorFlow)
+        """
+        _, model_layers = read_h5(path)
+        layers = {}
+        for class_name, config, _, weights in model_layers:
+            layers.setdefault(class_name, (config, weights))
+        if "LSTM" not in layers or "Dense" not in layers:
+            raise ValueError(f"{path} is not an LSTM -> Dense model")
+        lstm_config, lstm_weights = layers["LSTM"]
+        _, dense_weights = layers["Dense"]
+        return cls(*lstm_weights, *dense_weights,
+                   activation=lstm_config.get("activation", "tanh"),
+                   recurrent_activation=lstm_config.get("recurrent_activation", "sigmoid"))
+
+    @classmethod
+    def from_keras(cls, model):
+        layers = {layer.__class__.__name__: layer for layer in model.layers}
+        lstm = layers["LSTM"]
+        config = lstm.get_config()
+        return cls(*lstm.get_weights(), *layers["Dense"].get_weights(),
+                   activation=config.get("activation", "tanh"),
+                   recurrent_activation=config.get("recurrent_activation", "sigmoid"))
+
+    def zero_state(self, batch=1):
+        return (np.zeros((batch, self.units), dtype=np.float32),
+                np.zeros((batch, self.units), dtype=np.float32))
+
+    def cell(self, xw, state):
+        """
+        One LSTM step from precomputed input projections xw = x @ kernel + bias
+        """
+        return lstm_step(xw, state, self.recurrent_kernel, self.activation, self.recurrent_activation)
+
+    def output(self, h):
+        return softmax(h @ self.dense_kernel + self.dense_bias)
+
+    def embed(self, indices):
+        """
+        Input projections for a batch of character indices; one-hot @ kernel is a row lookup.
+        Negative indices (characters outside the vocabulary) contribute only the bias.
+        """
+        indices = np.asarray(indices)
+        xw = self.kernel[np.maximum(indices, 0)] + self.bias
+        unknown = indices < 0
+        if unknown.any():
+            xw[unknown] = self.bias
+        return xw
+
+    def predict(self, x, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        xw = x @ self.kernel + self.bias
+        state = self.zero_state(len(x))
+        for t in range(x.shape[1]):
+            state = self.cell(xw[:, t], state)
+        return self.output(state[0])
+
+class StatefulDecoder:
+    """
+    Carries the LSTM hidden and cell state between calls so that each generated
+    character costs one recurrent step instead of re-running the whole window.
+    Accepts a CharLSTM or a Keras model (whose weights are copied once).
+    """
+    def __init__(self, model, char_to_index, batch=1, cache=None):
+        self.model = model if isinstance(model, CharLSTM) else CharLSTM.from_keras(model)
+        self.char_to_index = char_to_index
+        self.cache = cache
+        self.state = self.model.zero_state(batch)
+
+    def reset(self, batch=1):
+        self.state = self.model.zero_state(batch)
+
+    def step(self, indices):
+        """
+        Advance every sequence in the batch by one character; returns next-character probabilities
+        """
+        self.state = self.model.cell(self.model.embed(np.atleast_1d(indices)), self.state)
+        return self.model.output(self.state[0])
+
+    def feed(self, text):
+        """
+        Run a seed through the model from a fresh state; returns the distribution after its last character
+        """
+        return self.feed_batch([text])
+
+    def feed_batch(self, texts):
+        """
+        Run several seeds through the model together from a fresh state.
+        Identical seeds are computed once. With a PrefixStateCache, each seed
+        resumes from its longest cached prefix and only the rest is run (the
+        cache is keyed on the texts exactly as given here).
+        """
+        unique, rows = np.unique(np.array(texts, dtype=object), return_inverse=True)
+        unique = list(unique)
+        h, c = self.model.zero_state(len(unique))
+        done = np.zeros(len(unique), dtype=np.int64)
+        cached_preds = [None] * len(unique)
+        if self.cache is not None:
+            for row, text in enumerate(unique):
+                done[row], state, cached_preds[row] = self.cache.lookup(text)
+                if state is not None:
+                    h[row], c[row] = state[0][0], state[1][0]
+
+        # Remaining suffixes are right-aligned; a row only advances once its suffix has started
+        suffixes = [text[n:] for text, n in zip(unique, done)]
+        steps = max((len(text) for text in suffixes), default=0)
+        if steps == 0 and all(p is not None for p in cached_preds):
+            preds = np.concatenate(cached_preds)
+        else:
+            indices = np.full((len(unique), steps), -1)
+            for row, text in enumerate(suffixes):
+                if text:
+                    indices[row, steps - len(text):] = [self.char_to_index.get(ch, -1) for ch in text]
+            starts = np.array([steps - len(text) for text in suffixes])
+            xw = self.model.embed(indices)
+            for t in range(steps):
+                h_new, c_new = self.model.cell(xw[:, t], (h, c))
+                active = (starts <= t)[:, None]
+                h, c = np.where(active, h_new, h), np.where(active, c_new, c)
+            preds = self.model.output(h)
+            if self.cache is not None:
+                for row, text in enumerate(unique):
+                    if len(suffixes[row]):
+                        self.cache.put(text, (h[row:row + 1], c[row:row + 1]), preds[row:row + 1])
+
+        self.state = (h[rows], c[rows])
+        return preds[rows]
+
+def load_serving_model(path, backend="numpy"):
+    """
+    Load the saved model for inference; TensorFlow is only imported for the keras backend
+    """
+    if backend == "numpy":
+        return CharLSTM.from_h5(path)
+    from tensorflow.keras.models import load_model
+    return load_model(path)
+
+def output_size(model):
+    """
+    Number of characters the model predicts over (its softmax width)
+    """
+    if isinstance(model, CharLSTM):
+        return model.dense_bias.shape[0]
+    return model.output_shape[-1]
@@ -0,0 +1,87 @@
+import sys
+import threading
+from collections import OrderedDict
+
+class PrefixStateCache:
+    """
+    Memory-bounded LRU map from a seed prefix to the LSTM (h, c) state and the
+    next-character distribution after it.
+
+    Regenerating from the same seed reuses the state outright; a seed that
+    extends a cached one resumes from the longest cached prefix and only runs
+    the new characters. Entries are evicted least recently used first once
+    max_bytes is exceeded.
+
+    The generators only feed the last seq_length characters of a seed, so a
+    seed longer than that window gets a new key whenever it grows: prefix
+    resumes apply to seeds shorter than the window, and longer seeds only
+    hit when the same window is requested again.
+    """
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+        self.chars_saved = 0
+
+    @staticmethod
+    def _entry_bytes(key, value):
+        (h, c), preds = value
+        return sys.getsizeof(key) + h.nbytes + c.nbytes + preds.nbytes
+
+    def lookup(self, text):
+        """
+        Longest cached prefix of text: (prefix length, state, preds), or (0, None, None)
+        """
+        if not text:
+            return 0, None, None
+        with self._lock:
+            for end in range(len(text), 0, -1):
+                value = self._entries.get(text[:end])
+                if value is not None:
+                    self._entries.move_to_end(text[:end])
+                    if end == len(text):
+                        self.hits += 1
+                    else:
+                        self.prefix_hits += 1
+                    self.chars_saved += end
+                    return end, value[0], value[1]
+            self.misses += 1
+            return 0, None, None
+
+    def put(self, text, state, preds):
+        if not text:
+            return
+        # Own copies: the caller's rows are views that would pin its whole batch arrays
+        value = ((state[0].copy(), state[1].copy()), preds.copy())
+        size = self._entry_bytes(text, value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if text in self._entries:
+                self._bytes -= self._entry_bytes(text, self._entries.pop(text))
+            self._entries[text] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                key, old = self._entries.popitem(last=False)
+                self._bytes -= self._entry_bytes(key, old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.prefix_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "prefix_hits": self.prefix_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.prefix_hits) / lookups if lookups else 0.0,
+            "chars_saved": self.chars_saved,
+        }
@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+
+import h5py
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from numpy_lstm import CharLSTM, StatefulDecoder
+
+MODEL_PATH = os.path.join(ROOT, "textgenerator.h5")
+VOCAB_PATH = os.path.join(ROOT, "textgenerator.vocab.json")
+
+pytestmark = pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason="no saved model")
+
+def h5_weights(name):
+    """
+    {"kernel": ..., "bias": ...} of the named layer, read straight from the file
+    """
+    found = {}
+
+    def visit(path, obj):
+        if isinstance(obj, h5py.Dataset) and path.split("/")[0] == name:
+            found[path.split("/")[-1]] = obj[()]
+
+    with h5py.File(MODEL_PATH, "r") as f:
+        f["model_weights"].visititems(visit)
+    return found
+
+def reference_predict(x):
+    """
+    Keras LSTM (gates i, f, c, o) -> Dense -> softmax written out step by step
+    """
+    lstm, dense = h5_weights("lstm"), h5_weights("dense")
+    kernel, recurrent, bias = lstm["kernel"], lstm["recurrent_kernel"], lstm["bias"]
+    units = recurrent.shape[0]
+    sigmoid = lambda z: 1 / (1 + np.exp(-z))
+    h = np.zeros((len(x), units))
+    c = np.zeros((len(x), units))
+    for t in range(x.shape[1]):
+        z = x[:, t] @ kernel + h @ recurrent + bias
+        i, f, g, o = (z[:, k * units:(k + 1) * units] for k in range(4))
+        c = sigmoid(f) * c + sigmoid(i) * np.tanh(g)
+        h = sigmoid(o) * np.tanh(c)
+    logits = h @ dense["kernel"] + dense["bias"]
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+@pytest.fixture(scope="module")
+def model():
+    return CharLSTM.from_h5(MODEL_PATH)
+
+@pytest.fixture(scope="module")
+def characters():
+    with open(VOCAB_PATH, encoding="utf-8") as f:
+        return json.load(f)["characters"]
+
+def one_hot_windows(vocab, n=8, length=40, seed=0):
+    codes = np.random.default_rng(seed).integers(0, vocab, size=(n, length))
+    return np.eye(vocab, dtype=np.float32)[codes], codes
+
+def test_predict_matches_reference(model):
+    x, _ = one_hot_windows(len(model.dense_bias))
+    np.testing.assert_allclose(model.predict(x), reference_predict(x), atol=1e-5)
+
+def test_predict_matches_keras(model):
+    keras = pytest.importorskip("tensorflow").keras
+    x, _ = one_hot_windows(len(model.dense_bias), seed=1)
+    expected = keras.models.load_model(MODEL_PATH, compile=False).predict(x, verbose=0)
+    np.testing.assert_allclose(model.predict(x), expected, atol=1e-5)
+
+def test_decoder_matches_window_predict(model, characters):
+    char_to_index = {ch: i for i, ch in enumerate(characters)}
+    seeds = ["to be, or not to be", "shall i compare thee", "to be, or not to be"]
+    decoder = StatefulDecoder(model, char_to_index)
+    preds = decoder.feed_batch(seeds)
+    vocab = len(characters)
+    for seed, row in zip(seeds, preds):
+        x = np.eye(vocab, dtype=np.float32)[[char_to_index[ch] for ch in seed]][None]
+        np.testing.assert_allclose(row, model.predict(x)[0], atol=1e-5)
+    # One carried step equals re-running the window with the new character
+    step = decoder.step([char_to_index["t"]] * len(seeds))
+    x = np.eye(vocab, dtype=np.float32)[[char_to_index[ch] for ch in seeds[0] + "t"]][None]
+    np.testing.assert_allclose(step[0], model.predict(x)[0], atol=1e-5)
@@ -1,6 +1,6 @@
 import streamlit as st
-from network.graph import create_graph, add_node, add_edge
-from network.metrics import calculate_metrics
+from network.graph import create_graph, add_node, add_edge, set_edge_params
+from network.metrics import calculate_metrics, get_engine
 from components.graph_viewer import display_graph
 from network.ai_optimizer import suggest_improvements
 
@@ -47,8 +47,7 @@ elif slide == "Set Parameters":
             st.write(f"Edge {u} - {v}")
             bandwidth = st.number_input(f"Bandwidth {u}-{v}", value=data.get('bandwidth', 100))
             latency = st.number_input(f"Latency {u}-{v}", value=data.get('latency', 10))
-            data['bandwidth'] = bandwidth
-            data['latency'] = latency
+            set_edge_params(G, u, v, bandwidth, latency)
 
 # -----------------------------
 # Slide 3: View KPIs
@@ -62,6 +61,20 @@ elif slide == "View KPIs":
         st.metric("Total Bandwidth", total_bandwidth)
         st.metric("Average Latency", avg_latency)
         st.metric("Total Cost", total_cost)
+
+        st.subheader("Path KPIs")
+        engine = get_engine(G)
+        summary = engine.path_summary()
+        note = "" if summary["exact"] else f" (estimated from {summary['sources']} sources)"
+        st.metric("Average Shortest-Path Latency" + note, round(summary["avg_shortest_latency"], 2))
+        st.metric("Latency Diameter" + ("" if summary["exact"] else " (lower bound)"), summary["diameter"])
+        source = st.selectbox("From", G.nodes)
+        target = st.selectbox("To", G.nodes)
+        latency = engine.shortest_latency(source, target)
+        bottleneck = engine.bottleneck_bandwidth(source, target)
+        st.metric("Shortest Latency", "unreachable" if latency is None else latency)
+        st.metric("Bottleneck Bandwidth", "unreachable" if bottleneck is None else bottleneck)
+
         st.subheader("Network Graph")
         display_graph(G)
 
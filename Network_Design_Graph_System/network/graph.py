@@ -1,11 +1,39 @@
 import networkx as nx
 
+from network.metrics import get_engine
+
 def create_graph():
     G = nx.Graph()
+    get_engine(G)
     return G
 
+# Mutate graphs only through these helpers: they keep the MetricsEngine's
+# cached KPIs in sync (see network.metrics.get_engine).
+
 def add_node(G, node_name, node_type="Router"):
+    engine = get_engine(G)
+    existed = node_name in G
     G.add_node(node_name, type=node_type)
+    engine.node_added(node_name, existed)
 
 def add_edge(G, node1, node2, bandwidth=100, latency=10):
+    engine = get_engine(G)
+    old = dict(G.edges[node1, node2]) if G.has_edge(node1, node2) else None
+    existed = [node in G for node in (node1, node2)]
     G.add_edge(node1, node2, bandwidth=bandwidth, latency=latency)
+    for node, was_there in zip((node1, node2), existed):
+        engine.node_added(node, was_there)
+    engine.edge_updated(node1, node2, old, G.edges[node1, node2])
+
+def set_edge_params(G, node1, node2, bandwidth, latency):
+    """
+    Change an existing edge's parameters and keep the cached KPIs in sync
+    """
+    engine = get_engine(G)
+    data = G.edges[node1, node2]
+    if data.get('bandwidth') == bandwidth and data.get('latency') == latency:
+        return
+    old = dict(data)
+    data['bandwidth'] = bandwidth
+    data['latency'] = latency
+    engine.edge_updated(node1, node2, old, data)
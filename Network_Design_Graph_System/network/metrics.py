@@ -1,7 +1,240 @@
+import heapq
+import random
+import weakref
+from collections import OrderedDict
+
+import networkx as nx
+
+NODE_COST = 100
+EDGE_COST = 50
+
+def _latency(u, v, data):
+    return data.get('latency', 0)
+
+class MetricsEngine:
+    """
+    KPIs kept up to date by the graph mutators in network.graph.
+
+    Totals (bandwidth, latency sum, node/edge counts, cost) change in O(1) per
+    mutation. Path KPIs are cached:
+      - shortest latency: per-source Dijkstra results in an LRU; adding an edge
+        or lowering a latency repairs them in place by relaxing only the nodes
+        that improve, raising a latency drops only the sources that used the edge
+      - bottleneck bandwidth: a maximum spanning forest, updated on inserts by
+        swapping out the weakest edge of the cycle, rebuilt only after a forest
+        edge loses bandwidth
+      - average shortest latency and diameter: exact up to exact_limit nodes,
+        otherwise estimated from a fixed sample of sources (diameter as a lower bound)
+    """
+    def __init__(self, G, max_sources=512, exact_limit=500, sample_sources=16, seed=0):
+        self.G = G
+        self.max_sources = max_sources
+        self.exact_limit = exact_limit
+        self.sample_sources = sample_sources
+        self.rng = random.Random(seed)
+        self.nodes = G.number_of_nodes()
+        self.edges = G.number_of_edges()
+        self.bandwidth_sum = 0
+        self.latency_sum = 0
+        for u, v, data in G.edges(data=True):
+            self.bandwidth_sum += data.get('bandwidth', 0)
+            self.latency_sum += data.get('latency', 0)
+        self._sources = OrderedDict()
+        self._samples = []
+        self._summary = None
+        self._forest = None
+
+    # ---- mutation hooks -------------------------------------------------
+
+    def node_added(self, node, existed):
+        if not existed:
+            self.nodes += 1
+            self._summary = None
+            if self._forest is not None:
+                self._forest.add_node(node)
+
+    def edge_updated(self, u, v, old, new):
+        """
+        Called after edge (u, v) was added (old is None) or its attributes changed from old to new
+        """
+        old_bandwidth = old.get('bandwidth', 0) if old else 0
+        old_latency = old.get('latency', 0) if old else None
+        new_bandwidth = new.get('bandwidth', 0)
+        new_latency = new.get('latency', 0)
+        if old is None:
+            self.edges += 1
+        self.bandwidth_sum += new_bandwidth - old_bandwidth
+        self.latency_sum += new_latency - (old_latency or 0)
+
+        if old_latency is None or new_latency < old_latency:
+            self._relax_sources(u, v, new_latency)
+            self._summary = None
+        elif new_latency > old_latency:
+            self._drop_sources_using(u, v, old_latency)
+            self._summary = None
+        self._update_forest(u, v, old_bandwidth if old else None, new_bandwidth)
+
+    # ---- totals -----------------------------------------------------------
+
+    def totals(self):
+        """
+        (total bandwidth, average latency, total cost), as calculate_metrics returns them
+        """
+        if self.edges == 0:
+            return 0, 0, 0
+        return self.bandwidth_sum, self.latency_sum / self.edges, self.nodes * NODE_COST + self.edges * EDGE_COST
+
+    # ---- shortest latency ---------------------------------------------
+
+    def distances_from(self, source):
+        """
+        Shortest latency from source to every reachable node (cached)
+        """
+        dist = self._sources.get(source)
+        if dist is None:
+            dist = nx.single_source_dijkstra_path_length(self.G, source, weight=_latency)
+            self._sources[source] = dist
+            if len(self._sources) > self.max_sources:
+                self._sources.popitem(last=False)
+        else:
+            self._sources.move_to_end(source)
+        return dist
+
+    def shortest_latency(self, u, v):
+        if u not in self._sources and v in self._sources:
+            u, v = v, u
+        return self.distances_from(u).get(v)
+
+    def _relax_sources(self, u, v, latency):
+        # Dynamic SSSP for a decrease: start from the edge's endpoints and only
+        # revisit nodes whose distance actually improves.
+        for dist in self._sources.values():
+            heap = []
+            for a, b in ((u, v), (v, u)):
+                if a in dist and dist[a] + latency < dist.get(b, float('inf')):
+                    dist[b] = dist[a] + latency
+                    heapq.heappush(heap, (dist[b], b))
+            while heap:
+                d, x = heapq.heappop(heap)
+                if d > dist[x]:
+                    continue
+                for y, data in self.G.adj[x].items():
+                    nd = d + data.get('latency', 0)
+                    if nd < dist.get(y, float('inf')):
+                        dist[y] = nd
+                        heapq.heappush(heap, (nd, y))
+
+    def _drop_sources_using(self, u, v, old_latency):
+        # Only sources whose shortest paths ran over the edge can get worse
+        stale = [s for s, dist in self._sources.items()
+                 if u in dist and v in dist and abs(abs(dist[u] - dist[v]) - old_latency) <= 1e-9 * max(1, old_latency)]
+        for source in stale:
+            del self._sources[source]
+
+    # ---- bottleneck bandwidth -----------------------------------------
+
+    def _build_forest(self):
+        self._forest = nx.maximum_spanning_tree(self.G, weight='bandwidth')
+
+    def _forest_path(self, u, v):
+        try:
+            return nx.shortest_path(self._forest, u, v)
+        except nx.NetworkXNoPath:
+            return None
+
+    def _update_forest(self, u, v, old_bandwidth, bandwidth):
+        if self._forest is None:
+            return
+        forest = self._forest
+        if forest.has_edge(u, v):
+            if old_bandwidth is not None and bandwidth < old_bandwidth:
+                self._forest = None  # a tree edge got weaker: rebuild on next query
+            else:
+                forest.edges[u, v]['bandwidth'] = bandwidth
+            return
+        forest.add_nodes_from((u, v))
+        path = self._forest_path(u, v)
+        if path is None:
+            forest.add_edge(u, v, bandwidth=bandwidth)
+            return
+        # The new edge closes a cycle: keep it only if it beats the weakest edge on it
+        a, b = min(zip(path, path[1:]), key=lambda e: forest.edges[e].get('bandwidth', 0))
+        if bandwidth > forest.edges[a, b].get('bandwidth', 0):
+            forest.remove_edge(a, b)
+            forest.add_edge(u, v, bandwidth=bandwidth)
+
+    def bottleneck_bandwidth(self, u, v):
+        """
+        Largest bandwidth achievable between u and v (the max-min path), or None if not connected
+        """
+        if self._forest is None:
+            self._build_forest()
+        path = self._forest_path(u, v)
+        if path is None:
+            return None
+        if len(path) == 1:
+            return float('inf')
+        return min(self._forest.edges[e].get('bandwidth', 0) for e in zip(path, path[1:]))
+
+    # ---- path summary --------------------------------------------------
+
+    def path_summary(self):
+        """
+        Average shortest latency over connected pairs and latency diameter (cached)
+        """
+        if self._summary is not None:
+            return self._summary
+        exact = self.nodes <= self.exact_limit
+        if exact:
+            sources = list(self.G.nodes)
+        else:
+            # A fixed sample keeps its cached distances, which edge inserts repair in place
+            self._samples = [s for s in self._samples if s in self.G]
+            missing = self.sample_sources - len(self._samples)
+            if missing > 0:
+                self._samples += self.rng.sample(list(self.G.nodes), min(missing, self.nodes))
+            sources = list(self._samples)
+
+        total = 0
+        pairs = 0
+        diameter = 0
+        farthest = None
+        for source in sources:
+            dist = self.distances_from(source)
+            total += sum(dist.values())
+            pairs += len(dist) - 1
+            node, d = max(dist.items(), key=lambda item: item[1])
+            if d >= diameter:
+                diameter, farthest = d, node
+        if not exact and farthest is not None:
+            # Double sweep: the node farthest from the sample is a good eccentric start
+            diameter = max(diameter, max(self.distances_from(farthest).values()))
+
+        self._summary = {
+            "avg_shortest_latency": total / pairs if pairs else 0,
+            "diameter": diameter,
+            "exact": exact,
+            "sources": len(sources),
+        }
+        return self._summary
+
+# Engines are kept off G.graph: G.copy() copies that dict shallowly, so a copy
+# would share (and corrupt) the original's engine.
+_engines = weakref.WeakKeyDictionary()
+
+def get_engine(G):
+    """
+    The MetricsEngine for G, created on first use.
+
+    The engine is updated by the mutators in network.graph; mutate G only
+    through them. A node or edge count that no longer matches (G was changed
+    directly with networkx) rebuilds the engine from scratch, but attribute
+    edits made behind its back cannot be detected.
+    """
+    engine = _engines.get(G)
+    if engine is None or engine.G is not G or engine.nodes != G.number_of_nodes() or engine.edges != G.number_of_edges():
+        engine = _engines[G] = MetricsEngine(G)
+    return engine
+
 def calculate_metrics(G):
-    if G.number_of_edges() == 0:
-        return 0, 0, 0
-    total_bandwidth = sum([data.get('bandwidth', 0) for u,v,data in G.edges(data=True)])
-    avg_latency = sum([data.get('latency', 0) for u,v,data in G.edges(data=True)]) / G.number_of_edges()
-    total_cost = G.number_of_nodes()*100 + G.number_of_edges()*50
-    return total_bandwidth, avg_latency, total_cost
+    return get_engine(G).totals()
@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+
+import networkx as nx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.graph import add_edge, add_node, create_graph, set_edge_params
+from network.metrics import calculate_metrics, get_engine
+
+def brute_force_totals(G):
+    if G.number_of_edges() == 0:
+        return 0, 0, 0
+    bandwidth = sum(d.get('bandwidth', 0) for _, _, d in G.edges(data=True))
+    latency = sum(d.get('latency', 0) for _, _, d in G.edges(data=True)) / G.number_of_edges()
+    return bandwidth, latency, G.number_of_nodes() * 100 + G.number_of_edges() * 50
+
+def brute_force_bottleneck(G, u, v):
+    if not nx.has_path(G, u, v):
+        return None
+    if u == v:
+        return float('inf')
+    # Largest threshold that still connects u and v
+    for b in sorted({d['bandwidth'] for _, _, d in G.edges(data=True)}, reverse=True):
+        H = nx.Graph((a, c) for a, c, d in G.edges(data=True) if d['bandwidth'] >= b)
+        if u in H and v in H and nx.has_path(H, u, v):
+            return b
+
+@pytest.mark.parametrize("seed", range(5))
+def test_engine_matches_networkx(seed):
+    rng = random.Random(seed)
+    G = create_graph()
+    nodes = [f"n{i}" for i in range(25)]
+    for node in nodes[:5]:
+        add_node(G, node)
+    engine = get_engine(G)
+    for step in range(150):
+        u, v = rng.sample(nodes, 2)
+        if G.has_edge(u, v) and rng.random() < 0.5:
+            set_edge_params(G, u, v, rng.randint(1, 100), rng.randint(1, 50))
+        else:
+            add_edge(G, u, v, rng.randint(1, 100), rng.randint(1, 50))
+        if step % 10:
+            continue
+        assert calculate_metrics(G) == pytest.approx(brute_force_totals(G))
+        lengths = dict(nx.all_pairs_dijkstra_path_length(G, weight='latency'))
+        for a, b in (rng.sample(list(G.nodes), 2) for _ in range(10)):
+            assert engine.shortest_latency(a, b) == lengths[a].get(b)
+            assert engine.bottleneck_bandwidth(a, b) == brute_force_bottleneck(G, a, b)
+        summary = engine.path_summary()
+        pairs = [d for src in lengths.values() for d in src.values()]
+        assert summary["exact"]
+        assert summary["avg_shortest_latency"] == pytest.approx(sum(pairs) / (len(pairs) - len(lengths)))
+        assert summary["diameter"] == max(pairs)
+
+def test_copy_gets_its_own_engine():
+    G = create_graph()
+    add_edge(G, 'a', 'b', 100, 10)
+    H = G.copy()
+    add_edge(H, 'b', 'c', 5, 5)
+    assert calculate_metrics(G) == (100, 10, 250)
+    assert calculate_metrics(H) == (105, 7.5, 400)
+
+def test_direct_networkx_mutation_rebuilds_engine():
+    G = create_graph()
+    add_edge(G, 'a', 'b', 100, 10)
+    G.add_edge('b', 'c', bandwidth=20, latency=30)
+    assert calculate_metrics(G) == brute_force_totals(G)
+    assert get_engine(G).shortest_latency('a', 'c') == 40
@@ -0,0 +1,122 @@
+import threading
+from math import gcd
+
+import numpy as np
+
+TARGET_RATE = 16000  # Whisper expects 16 kHz mono float32
+
+def frame_to_mono(frame):
+    """
+    float32 mono samples in [-1, 1] from an av.AudioFrame (packed or planar, any channel count)
+    """
+    audio = frame.to_ndarray()
+    channels = len(frame.layout.channels)
+    if frame.format.is_planar:
+        audio = audio.reshape(channels, -1).T
+    else:
+        audio = audio.reshape(-1, channels)
+    if audio.dtype == np.int16:
+        scale = 1.0 / 32768.0
+    elif audio.dtype == np.int32:
+        scale = 1.0 / 2147483648.0
+    else:
+        scale = 1.0
+    return audio.mean(axis=1, dtype=np.float32) * np.float32(scale)
+
+class StreamingResampler:
+    """
+    Polyphase windowed-sinc resampler that converts arbitrary-size chunks and
+    carries its filter history between calls, so chunk boundaries are seamless.
+    """
+    def __init__(self, in_rate, out_rate=TARGET_RATE, taps_per_phase=48):
+        g = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.taps_per_phase = taps_per_phase
+
+        # Low-pass at the lower of the two Nyquist rates, designed at in_rate * up
+        n = taps_per_phase * self.up
+        cutoff = 0.5 / max(self.up, self.down)
+        t = np.arange(n) - (n - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, 8.0) * self.up
+        # Row p holds taps h[p], h[p + up], ...: the filter for output phase p
+        self.phases = h.reshape(taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+        self.history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self.consumed = 0   # input samples seen so far
+        self.produced = 0   # output samples emitted so far
+
+    def process(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.up == self.down:
+            return samples
+        x = np.concatenate([self.history, samples])
+        base = self.consumed - len(self.history)   # stream index of x[0]
+        self.consumed += len(samples)
+
+        # Output k sits at upsampled position k * down, i.e. input index (k * down) // up
+        last = (self.consumed * self.up - 1) // self.down
+        k = np.arange(self.produced, last + 1)
+        self.produced = last + 1
+        positions = k * self.down
+        index = positions // self.up - base
+        phase = positions % self.up
+        windows = np.lib.stride_tricks.sliding_window_view(x, self.taps_per_phase)
+        out = np.einsum("ij,ij->i", windows[index - self.taps_per_phase + 1], self.phases[phase])
+
+        self.history = x[len(x) - (self.taps_per_phase - 1):].copy()
+        return out.astype(np.float32)
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity, thread-safe buffer of the most recent audio over one
+    preallocated float32 array. Samples are addressed by their absolute stream
+    index, so readers can ask for "everything since position n".
+    """
+    def __init__(self, seconds=300, sample_rate=TARGET_RATE):
+        self.sample_rate = sample_rate
+        self.capacity = int(seconds * sample_rate)
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self._written = 0
+        self._lock = threading.Lock()
+
+    @property
+    def written(self):
+        """
+        Total samples written since the start of the stream
+        """
+        return self._written
+
+    def __len__(self):
+        return min(self._written, self.capacity)
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        with self._lock:
+            # Anything older than capacity would be overwritten in the same call
+            kept = samples[-self.capacity:]
+            start = (self._written + len(samples) - len(kept)) % self.capacity
+            first = min(len(kept), self.capacity - start)
+            self._data[start:start + first] = kept[:first]
+            self._data[:len(kept) - first] = kept[first:]
+            self._written += len(samples)
+
+    def read(self, start=None, end=None):
+        """
+        Copy of samples [start, end) by absolute stream index; defaults to
+        everything still held. Positions that were overwritten are skipped.
+        """
+        with self._lock:
+            end = self._written if end is None else min(end, self._written)
+            oldest = self._written - len(self)
+            start = oldest if start is None else max(start, oldest)
+            if end <= start:
+                return np.zeros(0, dtype=np.float32)
+            i, j = start % self.capacity, end % self.capacity
+            if i < j:
+                return self._data[i:j].copy()
+            return np.concatenate([self._data[i:], self._data[:j]])
+
+    def latest(self, seconds):
+        return self.read(start=self._written - int(seconds * self.sample_rate))
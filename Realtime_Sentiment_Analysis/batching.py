@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+class MicroBatcher:
+    """
+    Collects single requests from any thread into micro-batches for one model.
+
+    The worker takes the first waiting request, then keeps collecting until
+    max_batch_size requests are in hand or max_wait_ms has passed since that
+    first request, and runs them as one batch: batch_fn(list_of_inputs) must
+    return one result per input. Callers get a Future per request.
+
+    Larger max_batch_size / max_wait_ms trade per-request latency for throughput.
+    """
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=10.0, name="micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue()
+        self._batch_sizes = Counter()
+        self._latencies = deque(maxlen=5000)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _, _ in batch]
+            try:
+                results = list(self.batch_fn(items))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} inputs")
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            with self._lock:
+                self._latencies.extend(done - submitted for _, _, submitted in batch)
+                self._batch_sizes[len(batch)] += 1
+                self.requests += len(batch)
+                self.batches += 1
+
+    def stats(self):
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            sizes = dict(sorted(self._batch_sizes.items()))
+        return {
+            "queue_depth": self._queue.qsize(),
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_sizes": sizes,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+        }
@@ -1,95 +1,169 @@
 # main.py
+import os
+import time
 import streamlit as st
 from streamlit_webrtc import webrtc_streamer, AudioProcessorBase
 import whisper
 import torch
 import numpy as np
-import librosa
 from transformers import pipeline
+from audio_stream import AudioRingBuffer, StreamingResampler, frame_to_mono
+from transcriber import TranscriptionWorker
+from model_registry import get_registry, quantize_int8
+from batching import MicroBatcher
+from mel_features import StreamingMelExtractor
+
+# Seconds of 16 kHz mono audio kept for analysis (~19 MB of float32)
+BUFFER_SECONDS = 300
+# QUANTIZE_INT8=1 serves int8 dynamically quantized CPU variants of both models
+QUANTIZE_INT8 = os.environ.get("QUANTIZE_INT8", "0") == "1"
+# Sentiment requests from all sessions are grouped into batches of up to
+# SENTIMENT_MAX_BATCH texts, waiting at most SENTIMENT_MAX_WAIT_MS for a batch to fill
+SENTIMENT_MAX_BATCH = int(os.environ.get("SENTIMENT_MAX_BATCH", "16"))
+SENTIMENT_MAX_WAIT_MS = float(os.environ.get("SENTIMENT_MAX_WAIT_MS", "10"))
 
 # -----------------------------
 # 1️⃣ Load Models
 # -----------------------------
 st.title("🎤 Real-Time Speech Emotion and Sentiment Analysis")
 
-# Whisper model for speech-to-text
-st.info("Loading Whisper model...")
-whisper_model = whisper.load_model("base")  
+def quantize_pipeline(analyzer):
+    analyzer.model = quantize_int8(analyzer.model)
+    return analyzer
 
+# Models are loaded and warmed up once per process and shared by every session
+# and rerun; only the first script run pays for loading.
+suffix = "-int8" if QUANTIZE_INT8 else ""
+WHISPER_MODEL = "whisper-base" + suffix
+SENTIMENT_MODEL = "sentiment" + suffix
+registry = get_registry()
+# Whisper model for speech-to-text
+registry.register(
+    WHISPER_MODEL,
+    lambda: whisper.load_model("base", device="cpu") if QUANTIZE_INT8 else whisper.load_model("base"),
+    warmup=lambda model: model.transcribe(np.zeros(16000, dtype=np.float32), fp16=False, language="en"),
+    quantize=quantize_int8 if QUANTIZE_INT8 else None,
+)
 # Text-based sentiment analysis model
-st.info("Loading sentiment analysis model...")
-sentiment_analyzer = pipeline("sentiment-analysis")
+registry.register(
+    SENTIMENT_MODEL,
+    lambda: pipeline("sentiment-analysis"),
+    warmup=lambda analyzer: analyzer("warm up"),
+    quantize=quantize_pipeline if QUANTIZE_INT8 else None,
+)
+with st.spinner("Loading models..."):
+    registry.load_all()
+
+# -----------------------------
+# 2️⃣ Speech-to-Text (Whisper)
+# -----------------------------
+def transcribe_segment(audio):
+    with registry.timed(WHISPER_MODEL):
+        return registry.get(WHISPER_MODEL).transcribe(audio, fp16=False, language="en")['text']
 
 # -----------------------------
-# 2️⃣ WebRTC Microphone Streaming
+# 3️⃣ Text Sentiment Analysis
+# -----------------------------
+def analyze_batch(texts):
+    # One padded forward pass for the whole micro-batch
+    with registry.timed(SENTIMENT_MODEL):
+        return registry.get(SENTIMENT_MODEL)(texts, batch_size=len(texts), truncation=True)
+
+@st.cache_resource
+def get_sentiment_service():
+    return MicroBatcher(analyze_batch, SENTIMENT_MAX_BATCH, SENTIMENT_MAX_WAIT_MS, name="sentiment-batcher")
+
+sentiment_service = get_sentiment_service()
+
+def analyze_sentiment(text):
+    return sentiment_service(text)  # Example: {'label': 'POSITIVE', 'score': 0.99}
+
+# -----------------------------
+# 4️⃣ WebRTC Microphone Streaming
 # -----------------------------
 class AudioProcessor(AudioProcessorBase):
     """
     This class processes audio frames from the microphone in real-time.
-    Each audio frame is appended to a buffer for later analysis.
+    Each frame is downmixed to mono, resampled to 16 kHz and written into a
+    fixed-size ring buffer, so memory stays constant however long the mic is open.
+    A background worker splits the stream into utterances and transcribes and
+    scores each one once, as soon as it ends.
     """
     def __init__(self):
-        self.buffer = []
+        self.buffer = AudioRingBuffer(BUFFER_SECONDS)
+        self.resampler = None
+        self.features = StreamingMelExtractor(self.buffer.sample_rate)
+        self.worker = TranscriptionWorker(self.buffer, transcribe_segment, analyze_sentiment).start()
 
     def recv(self, frame):
-        # Convert audio frame to numpy array
-        audio = frame.to_ndarray()
-        # Append the audio data to buffer
-        self.buffer.append(audio)
+        # WebRTC usually delivers 48 kHz (often stereo) frames; Whisper wants 16 kHz mono
+        if self.resampler is None or self.resampler.in_rate != frame.sample_rate:
+            self.resampler = StreamingResampler(frame.sample_rate)
+        self.buffer.write(self.resampler.process(frame_to_mono(frame)))
         return frame
 
-def process_audio(buffer):
+    def on_ended(self):
+        # Transcribes the last utterance even if the user stops mid-sentence
+        self.worker.stop()
+
+# -----------------------------
+# 5️⃣ Voice Feature Extraction (Optional)
+# -----------------------------
+def process_audio(processor):
     """
-    Convert audio buffer to a format suitable for analysis,
-    run speech-to-text with Whisper, and analyze text sentiment.
+    Mel-spectrogram of recent audio, to later feed a voice emotion classifier.
+    Only audio that arrived since the previous call is transformed.
     """
-    # Concatenate all buffered audio frames
-    audio_np = np.concatenate(buffer, axis=0)
-    
-    # Normalize audio to float32 [-1, 1]
-    audio_float = audio_np.astype(np.float32) / 32768.0
-
-    # Sample rate (Whisper expects 16kHz)
-    sr = 16000
-
-    # -----------------------------
-    # 3️⃣ Speech-to-Text (Whisper)
-    # -----------------------------
-    result = whisper_model.transcribe(audio_float, fp16=False, language="en")
-    text = result['text']
-
-    # -----------------------------
-    # 4️⃣ Text Sentiment Analysis
-    # -----------------------------
-    sentiment = sentiment_analyzer(text)[0]  # Example: {'label': 'POSITIVE', 'score': 0.99}
-
-    # -----------------------------
-    # 5️⃣ Voice Feature Extraction (Optional)
-    # -----------------------------
-    # Compute Mel-spectrogram to later feed a voice emotion classifier
-    mel_spec = librosa.feature.melspectrogram(y=audio_float, sr=sr, n_mels=128)
-    
-    return text, sentiment, mel_spec
+    processor.features.update(processor.buffer)
+    return processor.features.features()
+
+def render_results(processor):
+    worker = processor.worker
+    st.subheader("Transcribed Text")
+    st.write(worker.transcript() or "Listening...")
+
+    st.subheader("Text Sentiment")
+    segments = worker.results()
+    if segments:
+        latest = segments[-1]
+        st.write(f"{latest['label']} ({latest['score']:.2f})")
+        st.dataframe([
+            {"time": f"{s['start_s']:.1f}–{s['end_s']:.1f} s", "text": s["text"],
+             "sentiment": s["label"], "score": round(s["score"], 2), "latency (s)": round(s["latency_s"], 2)}
+            for s in reversed(segments)
+        ])
+    stats = worker.stats()
+    st.caption(f"{stats['segments']} segments · {stats['queued']} queued · "
+               f"latency p50 {stats['latency_p50_s']:.2f} s / max {stats['latency_max_s']:.2f} s")
+
+    mel_spec = process_audio(processor)
+    if mel_spec.shape[1]:
+        st.subheader("Mel-Spectrogram (Audio Features)")
+        st.line_chart(np.mean(mel_spec, axis=0))
 
 # -----------------------------
 # 6️⃣ Streamlit UI
 # -----------------------------
+with st.expander("Model metrics"):
+    st.dataframe(registry.stats())
+    batching = sentiment_service.stats()
+    st.caption(f"Sentiment batching: queue depth {batching['queue_depth']} · "
+               f"{batching['requests']} requests in {batching['batches']} batches "
+               f"(mean size {batching['mean_batch_size']:.1f}) · "
+               f"p50 {batching['p50_ms']:.0f} ms / p99 {batching['p99_ms']:.0f} ms")
+    st.bar_chart({str(size): count for size, count in batching["batch_sizes"].items()})
+
 st.write("Click 'Start' to begin microphone streaming.")
 webrtc_ctx = webrtc_streamer(key="speech-analysis", audio_processor_factory=AudioProcessor)
 
-# Once audio is collected, process it
 if webrtc_ctx.audio_processor:
-    if st.button("Analyze"):
-        buffer = webrtc_ctx.audio_processor.buffer
-        if buffer:
-            text, sentiment, mel_spec = process_audio(buffer)
-            st.subheader("Transcribed Text")
-            st.write(text)
-
-            st.subheader("Text Sentiment")
-            st.write(f"{sentiment['label']} ({sentiment['score']:.2f})")
-
-            st.subheader("Mel-Spectrogram (Audio Features)")
-            st.line_chart(np.mean(mel_spec, axis=0))
-        else:
-            st.warning("No audio data collected yet.")
+    processor = webrtc_ctx.audio_processor
+    # Transcripts arrive from the background worker and mel frames are computed
+    # only for new audio, so the page can refresh continuously while the mic is live
+    live = st.empty()
+    while webrtc_ctx.state.playing:
+        with live.container():
+            render_results(processor)
+        time.sleep(1)
+    with live.container():
+        render_results(processor)
@@ -0,0 +1,95 @@
+import threading
+
+import numpy as np
+
+class StreamingMelExtractor:
+    """
+    Incremental mel power spectrogram matching librosa.feature.melspectrogram
+    defaults (hann window, centred frames with zero padding, power 2).
+
+    Only audio that arrived since the last update is framed: the last
+    n_fft - hop samples are carried over between chunks, the mel filterbank and
+    window are computed once, and frames are windowed into a reusable buffer
+    (the spectrum itself is allocated per call: np.fft.rfft has no out=).
+    Frames land in a rolling (n_mels, max_frames) matrix, oldest dropped first.
+    """
+    def __init__(self, sample_rate=16000, n_fft=2048, hop_length=512, n_mels=128, max_frames=2000):
+        import librosa
+
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.max_frames = max_frames
+        self.window = librosa.filters.get_window("hann", n_fft, fftbins=True).astype(np.float32)
+        self.mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft, n_mels=n_mels).astype(np.float32)
+        # Centred framing: the stream starts with n_fft // 2 samples of zero padding
+        self._carry = np.zeros(n_fft // 2, dtype=np.float32)
+        self._scratch = np.empty((0, n_fft), dtype=np.float32)
+        self._frames = np.zeros((max_frames, n_mels), dtype=np.float32)
+        self._written = 0
+        self._cursor = 0
+        self.overruns = 0
+        self._lock = threading.Lock()
+
+    @property
+    def frames_written(self):
+        return self._written
+
+    def process(self, samples):
+        """
+        Append mel frames for the next samples of the stream; returns how many frames were added
+        """
+        with self._lock:
+            audio = np.concatenate([self._carry, np.asarray(samples, dtype=np.float32)])
+            if len(audio) < self.n_fft:
+                self._carry = audio
+                return 0
+            n = 1 + (len(audio) - self.n_fft) // self.hop_length
+            if len(self._scratch) < n:
+                self._scratch = np.empty((n, self.n_fft), dtype=np.float32)
+            frames = np.lib.stride_tricks.sliding_window_view(audio, self.n_fft)[::self.hop_length][:n]
+            windowed = np.multiply(frames, self.window, out=self._scratch[:n])
+            spectrum = np.fft.rfft(windowed, axis=1)
+            power = spectrum.real ** 2 + spectrum.imag ** 2
+            self._append(power.astype(np.float32) @ self.mel_basis.T)
+            self._carry = audio[n * self.hop_length:].copy()
+            return n
+
+    def update(self, buffer):
+        """
+        Process whatever an AudioRingBuffer received since the last update.
+
+        If the buffer wrapped past samples that were never processed, the lost
+        audio cannot be framed: the carry is reset and framing restarts from the
+        oldest sample still held, as at the start of a stream.
+        """
+        written = buffer.written
+        oldest = written - buffer.capacity
+        if self._cursor < oldest:
+            with self._lock:
+                self._carry = np.zeros(self.n_fft // 2, dtype=np.float32)
+            self._cursor = oldest
+            self.overruns += 1
+        new = buffer.read(self._cursor, written)
+        self._cursor = written
+        return self.process(new)
+
+    def _append(self, mel):
+        mel = mel[-self.max_frames:]
+        start = self._written % self.max_frames
+        first = min(len(mel), self.max_frames - start)
+        self._frames[start:start + first] = mel[:first]
+        self._frames[:len(mel) - first] = mel[first:]
+        self._written += len(mel)
+
+    def features(self, last=None):
+        """
+        Copy of the most recent frames as (n_mels, frames), oldest first
+        """
+        with self._lock:
+            held = min(self._written, self.max_frames)
+            count = held if last is None else min(last, held)
+            end = self._written % self.max_frames
+            index = (np.arange(end - count, end)) % self.max_frames
+            return self._frames[index].T.copy()
@@ -0,0 +1,141 @@
+import os
+import resource
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+def rss_bytes():
+    """
+    Current resident set size of this process
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak rather than current RSS, but better than nothing off Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def quantize_int8(model):
+    """
+    Dynamic int8 quantization of a torch module's Linear layers (CPU inference)
+    """
+    import torch
+
+    # Subclasses of nn.Linear (e.g. Whisper's dtype-casting Linear) are not in
+    # the quantization mappings; for fp32 CPU inference they are plain Linear,
+    # so each one is swapped on its parent for an nn.Linear sharing its parameters.
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                linear = torch.nn.Linear(child.in_features, child.out_features,
+                                         bias=child.bias is not None, device="meta")
+                linear.weight = child.weight
+                linear.bias = child.bias
+                setattr(parent, name, linear)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+class ModelEntry:
+    def __init__(self, name, loader, warmup=None, quantize=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.quantize = quantize
+        self.model = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.rss_delta = None
+        self.latencies = deque(maxlen=1000)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+class ModelRegistry:
+    """
+    Loads each registered model once per process and shares it across sessions.
+
+    A model is built on first get() (or by load_all() at startup): loader()
+    creates it, quantize(model) optionally converts it, and warmup(model)
+    runs a dummy input so the first real request does not pay for lazy
+    initialisation. Load time, resident memory and call latency are recorded.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, warmup=None, quantize=None):
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = ModelEntry(name, loader, warmup, quantize)
+        return self
+
+    def get(self, name):
+        entry = self._entries[name]
+        if entry.model is None:
+            with entry.lock:
+                if entry.model is None:
+                    self._load(entry)
+        return entry.model
+
+    def _load(self, entry):
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        model = entry.loader()
+        if entry.quantize is not None:
+            model = entry.quantize(model)
+        entry.load_seconds = time.perf_counter() - started
+        if entry.warmup is not None:
+            started = time.perf_counter()
+            entry.warmup(model)
+            entry.warmup_seconds = time.perf_counter() - started
+        entry.rss_delta = rss_bytes() - rss_before
+        entry.model = model
+
+    def load_all(self):
+        for name in list(self._entries):
+            self.get(name)
+        return self
+
+    @contextmanager
+    def timed(self, name):
+        """
+        Record the latency of one call of the named model: with registry.timed("whisper"): ...
+        """
+        entry = self._entries[name]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry.latencies.append(time.perf_counter() - started)
+            entry.calls += 1
+
+    def stats(self):
+        rows = []
+        for entry in list(self._entries.values()):
+            latencies = np.asarray(entry.latencies) * 1000
+            rows.append({
+                "model": entry.name,
+                "loaded": entry.model is not None,
+                "quantized": entry.quantize is not None,
+                "load_s": entry.load_seconds,
+                "warmup_s": entry.warmup_seconds,
+                "rss_mb": entry.rss_delta / 2**20 if entry.rss_delta is not None else None,
+                "calls": entry.calls,
+                "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            })
+        return rows
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    """
+    Process-wide ModelRegistry shared by every Streamlit session
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_stream import AudioRingBuffer, StreamingResampler
+
+def tone(rate, seconds, freq):
+    return np.sin(2 * np.pi * freq * np.arange(int(rate * seconds)) / rate).astype(np.float32)
+
+@pytest.mark.parametrize("in_rate", [44100, 48000, 22050, 8000])
+def test_chunked_resampling_matches_one_shot(in_rate):
+    x = np.random.default_rng(0).standard_normal(in_rate).astype(np.float32)
+    whole = StreamingResampler(in_rate).process(x)
+    resampler = StreamingResampler(in_rate)
+    cuts = np.sort(np.random.default_rng(1).integers(0, len(x), 20))
+    chunked = np.concatenate([resampler.process(part) for part in np.split(x, cuts)])
+    assert len(chunked) == len(whole)
+    np.testing.assert_allclose(chunked, whole, atol=1e-5)
+    assert abs(len(whole) - len(x) * 16000 / in_rate) <= 1
+
+@pytest.mark.parametrize("in_rate", [44100, 48000])
+def test_resampler_keeps_passband_and_rejects_aliases(in_rate):
+    resampler = StreamingResampler(in_rate)
+    # 1 kHz passes; 12 kHz is above the new 8 kHz Nyquist and must be filtered out
+    passed = resampler.process(tone(in_rate, 1.0, 1000))[2000:-2000]
+    assert abs(np.sqrt(2 * np.mean(passed ** 2)) - 1.0) < 0.01
+    spectrum = np.abs(np.fft.rfft(passed))
+    assert abs(np.argmax(spectrum) * 16000 / len(passed) - 1000) < 2
+    aliased = StreamingResampler(in_rate).process(tone(in_rate, 1.0, 12000))[2000:-2000]
+    assert np.sqrt(np.mean(aliased ** 2)) < 0.01
+
+def test_ring_buffer_keeps_latest_samples():
+    buffer = AudioRingBuffer(seconds=1, sample_rate=100)
+    x = np.arange(250, dtype=np.float32)
+    for part in np.split(x, [30, 170, 171]):
+        buffer.write(part)
+    assert buffer.written == 250
+    np.testing.assert_array_equal(buffer.read(), x[150:])
+    np.testing.assert_array_equal(buffer.read(200, 240), x[200:240])
+    # Overwritten positions are skipped
+    np.testing.assert_array_equal(buffer.read(0, 160), x[150:160])
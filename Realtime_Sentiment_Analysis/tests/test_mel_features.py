@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_stream import AudioRingBuffer
+from mel_features import StreamingMelExtractor
+
+def relative_error(a, b):
+    return np.abs(a - b).max() / np.abs(b).max()
+
+def test_streaming_frames_match_librosa():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(16000 * 2).astype(np.float32)
+    extractor = StreamingMelExtractor(max_frames=1000)
+    for part in np.split(x, np.sort(rng.integers(0, len(x), 30))):
+        extractor.process(part)
+    reference = librosa.feature.melspectrogram(y=x, sr=16000)
+    streamed = extractor.features()
+    # Frames near the end need right padding that a stream has not seen yet
+    assert streamed.shape[1] == extractor.frames_written
+    assert relative_error(streamed, reference[:, :streamed.shape[1]]) < 1e-5
+
+def test_rolling_window_keeps_latest_frames():
+    x = np.random.default_rng(1).standard_normal(16000 * 2).astype(np.float32)
+    extractor = StreamingMelExtractor(max_frames=20)
+    for part in np.array_split(x, 7):
+        extractor.process(part)
+    reference = librosa.feature.melspectrogram(y=x, sr=16000)[:, :extractor.frames_written]
+    assert relative_error(extractor.features(), reference[:, -20:]) < 1e-5
+    assert relative_error(extractor.features(last=5), reference[:, -5:]) < 1e-5
+
+def test_ring_buffer_overrun_restarts_framing():
+    x = np.random.default_rng(2).standard_normal(16000 * 3).astype(np.float32)
+    buffer = AudioRingBuffer(seconds=1, sample_rate=16000)
+    extractor = StreamingMelExtractor(max_frames=1000)
+    buffer.write(x[:8000])
+    extractor.update(buffer)
+    buffer.write(x[8000:40000])  # wraps past samples that were never processed
+    before = extractor.frames_written
+    extractor.update(buffer)
+    assert extractor.overruns == 1
+    # Framing restarts on the held second of audio as if it began a new stream
+    reference = librosa.feature.melspectrogram(y=x[24000:40000], sr=16000)
+    streamed = extractor.features()[:, before:]
+    assert relative_error(streamed, reference[:, :streamed.shape[1]]) < 1e-5
@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+class EnergySegmenter:
+    """
+    Splits a 16 kHz stream into utterances using frame RMS energy against an
+    adaptive noise floor. Speech must last min_speech_ms to open a segment and
+    silence must last max_silence_ms to close it; segments longer than
+    max_segment_s are cut so per-segment latency stays bounded.
+    """
+    def __init__(self, sample_rate=16000, frame_ms=30, min_rms=0.01, ratio=3.0,
+                 min_speech_ms=200, max_silence_ms=600, max_segment_s=15.0, pad_ms=150):
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.min_rms = min_rms
+        self.ratio = ratio
+        self.min_speech = max(1, min_speech_ms // frame_ms)
+        self.max_silence = max(1, max_silence_ms // frame_ms)
+        self.max_segment = int(max_segment_s * sample_rate)
+        self.pad = int(sample_rate * pad_ms / 1000)
+        self.noise = min_rms
+        self.reset(0)
+
+    def reset(self, position):
+        """
+        Drop any open segment and continue the stream from position
+        """
+        self.position = position   # stream index of the next unframed sample
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._speech_run = 0
+        self._silence_run = 0
+        self._start = None         # stream index where the open segment began
+
+    def feed(self, samples):
+        """
+        Consume the next samples of the stream; returns finalized (start, end) stream ranges
+        """
+        samples = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        n_frames = len(samples) // self.frame
+        self._pending = samples[n_frames * self.frame:]
+        frames = samples[:n_frames * self.frame].reshape(n_frames, self.frame)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+
+        segments = []
+        for energy in rms:
+            frame_start = self.position
+            self.position += self.frame
+            speech = energy > max(self.min_rms, self.noise * self.ratio)
+            if not speech:
+                self.noise = 0.95 * self.noise + 0.05 * energy
+
+            if self._start is None:
+                self._speech_run = self._speech_run + 1 if speech else 0
+                if self._speech_run >= self.min_speech:
+                    first = frame_start - (self._speech_run - 1) * self.frame
+                    self._start = max(0, first - self.pad)
+                    self._silence_run = 0
+                continue
+
+            self._silence_run = 0 if speech else self._silence_run + 1
+            if self._silence_run >= self.max_silence:
+                end = self.position - self._silence_run * self.frame + self.pad
+                segments.append((self._start, end))
+                self._start = None
+                self._speech_run = 0
+            elif self.position - self._start >= self.max_segment:
+                segments.append((self._start, self.position))
+                self._start = self.position
+        return segments
+
+    def flush(self):
+        """
+        End of stream: close the open segment, if any, at the last sample fed
+        """
+        end = self.position + len(self._pending)
+        segments = [(self._start, end)] if self._start is not None and end > self._start else []
+        self.reset(end)
+        return segments
+
+class TranscriptionWorker:
+    """
+    Background thread that follows an AudioRingBuffer, segments new audio into
+    utterances and transcribes + scores each finalized segment exactly once.
+
+    transcribe(audio) -> str and analyze(text) -> {"label", "score"} are
+    supplied by the app so the worker stays independent of the models.
+    """
+    def __init__(self, buffer, transcribe, analyze, segmenter=None, poll_interval=0.25,
+                 min_segment_s=0.3, max_segments=500):
+        self.buffer = buffer
+        self.transcribe = transcribe
+        self.analyze = analyze
+        self.segmenter = segmenter or EnergySegmenter(buffer.sample_rate)
+        self.poll_interval = poll_interval
+        self.min_segment = int(min_segment_s * buffer.sample_rate)
+        self.segments = deque(maxlen=max_segments)
+        self.last_error = None
+        self._cursor = 0
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="transcription-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stop following the buffer. The utterance still open in the segmenter and
+        any queued segments are transcribed first; waits up to timeout for that.
+        """
+        self._stop.set()
+        if self._thread is None:
+            self._poll_safely(final=True)
+        else:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self._poll_safely()
+        self._poll_safely(final=True)
+
+    def _poll_safely(self, final=False):
+        try:
+            self.poll(final)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Transcription failed: {e}")
+
+    def poll(self, final=False):
+        """
+        Segment audio written since the last poll, then transcribe finalized segments.
+        With final=True the open segment is closed too (end of stream).
+        """
+        sr = self.buffer.sample_rate
+        written = self.buffer.written
+        new = self.buffer.read(self._cursor, written)
+        if len(new) != written - self._cursor:
+            # Fell behind the ring: continue from the oldest audio still held
+            self.segmenter.reset(written - len(new))
+        self._cursor = written
+        segments = self.segmenter.feed(new)
+        if final:
+            segments += self.segmenter.flush()
+        for start, end in segments:
+            if end - start >= self.min_segment:
+                self._queue.append((start, end, time.time()))
+
+        while self._queue:
+            start, end, finalized = self._queue.popleft()
+            audio = self.buffer.read(start, end)
+            text = self.transcribe(audio).strip()
+            if not text:
+                continue
+            sentiment = self.analyze(text)
+            with self._lock:
+                self.segments.append({
+                    "start_s": start / sr,
+                    "end_s": end / sr,
+                    "text": text,
+                    "label": sentiment["label"],
+                    "score": sentiment["score"],
+                    "latency_s": time.time() - finalized,
+                })
+
+    def transcript(self, last=None):
+        with self._lock:
+            segments = list(self.segments)[-last:] if last else list(self.segments)
+        return " ".join(s["text"] for s in segments)
+
+    def results(self):
+        with self._lock:
+            return list(self.segments)
+
+    def stats(self):
+        with self._lock:
+            latencies = [s["latency_s"] for s in self.segments]
+        return {
+            "segments": len(latencies),
+            "queued": len(self._queue),
+            "latency_p50_s": float(np.percentile(latencies, 50)) if latencies else 0.0,
+            "latency_max_s": max(latencies, default=0.0),
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,185 @@
+"""
+TensorFlow-free inference for saved Keras models, shared by the apps in this
+repository: Keras activations, the LSTM cell, per-layer NumPy functions and an
+h5py reader for .h5 model files.
+
+Apps import it as common.numpy_keras after putting the repository root on
+sys.path (see AI_based_Task_Manager/numpy_backend.py).
+"""
+import json
+
+import numpy as np
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    None: lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": _sigmoid,
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+    "tanh": np.tanh,
+    "softmax": softmax,
+}
+
+def lstm_step(xw, state, recurrent_kernel, activation=np.tanh, recurrent_activation=_sigmoid):
+    """
+    One Keras LSTM step (gate order i, f, c, o) from precomputed input
+    projections xw = x @ kernel + bias; state is (h, c)
+    """
+    h, c = state
+    units = recurrent_kernel.shape[0]
+    z = xw + h @ recurrent_kernel
+    i = recurrent_activation(z[:, :units])
+    f = recurrent_activation(z[:, units:2 * units])
+    g = activation(z[:, 2 * units:3 * units])
+    o = recurrent_activation(z[:, 3 * units:])
+    c = f * c + i * g
+    h = o * activation(c)
+    return h, c
+
+def lstm_forward(x, kernel, recurrent_kernel, bias, activation=np.tanh,
+                 recurrent_activation=_sigmoid, return_sequences=False):
+    """
+    Keras LSTM forward pass over x of shape (batch, steps, features)
+    """
+    batch, steps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+    state = (np.zeros((batch, units), dtype=np.float32), np.zeros((batch, units), dtype=np.float32))
+    # Input projections for every step in one matrix product
+    xw = x @ kernel + bias
+    outputs = []
+    for t in range(steps):
+        state = lstm_step(xw[:, t], state, recurrent_kernel, activation, recurrent_activation)
+        if return_sequences:
+            outputs.append(state[0])
+    return np.stack(outputs, axis=1) if return_sequences else state[0]
+
+def build_layer(class_name, config, weights):
+    """
+    Return a NumPy function for one Keras layer, or None if the layer is not supported
+    """
+    weights = [np.asarray(w, dtype=np.float32) for w in weights]
+    if class_name in ("InputLayer", "Dropout"):
+        return lambda x: x
+    if class_name == "Activation":
+        activation = config.get("activation")
+        return ACTIVATIONS[activation] if activation in ACTIVATIONS else None
+    if class_name == "Dense":
+        activation = config.get("activation", "linear")
+        if activation not in ACTIVATIONS:
+            return None
+        act = ACTIVATIONS[activation]
+        W = weights[0]
+        b = weights[1] if len(weights) > 1 else np.zeros(W.shape[1], dtype=np.float32)
+        return lambda x: act(np.asarray(x, dtype=np.float32) @ W + b)
+    if class_name == "Embedding":
+        table = weights[0]
+        return lambda x: table[np.clip(np.asarray(x).astype(np.int64), 0, len(table) - 1)]
+    if class_name == "LSTM":
+        activation = config.get("activation", "tanh")
+        recurrent_activation = config.get("recurrent_activation", "sigmoid")
+        if activation not in ACTIVATIONS or recurrent_activation not in ACTIVATIONS:
+            return None
+        kernel, recurrent_kernel = weights[0], weights[1]
+        bias = weights[2] if len(weights) > 2 else np.zeros(kernel.shape[1], dtype=np.float32)
+        return lambda x: lstm_forward(np.asarray(x, dtype=np.float32), kernel, recurrent_kernel, bias,
+                                      ACTIVATIONS[activation], ACTIVATIONS[recurrent_activation],
+                                      config.get("return_sequences", False))
+    return None
+
+def inbound_layers(layer):
+    """
+    Names of the layers feeding this one in a Functional config (Keras 2 or 3)
+    """
+    nodes = layer.get("inbound_nodes") or []
+    if not nodes:
+        return []
+    node = nodes[0]
+    if isinstance(node, dict):
+        args = node["args"]
+        if len(args) == 1 and isinstance(args[0], list):
+            args = args[0]  # merge layers take a list of tensors
+        return [arg["config"]["keras_history"][0] for arg in args if isinstance(arg, dict)]
+    return [inbound[0] for inbound in node]
+
+def read_h5(path):
+    """
+    Return (model config, [(class name, layer config, inbound layer names, weights)])
+    from a Keras .h5 file, read with h5py
+    """
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        group = f["model_weights"]
+        layers = []
+        for layer in config["config"]["layers"]:
+            name = layer["config"]["name"]
+            weights = []
+            if name in group:
+                weights = [group[name][w][()] for w in group[name].attrs.get("weight_names", [])]
+            layers.append((layer["class_name"], layer["config"], inbound_layers(layer), weights))
+    return config, layers
+
+class NumpyModel:
+    """
+    TensorFlow-free inference for Sequential or single-input Functional models
+    made of Dense, Embedding, LSTM, Activation and Dropout layers
+    """
+    def __init__(self, nodes, outputs):
+        # nodes: [(name, fn, input layer name or None)] in topological order
+        self.nodes = nodes
+        self.outputs = outputs
+
+    @classmethod
+    def from_h5(cls, path):
+        """
+        Load architecture and weights from a Keras .h5 file, or return None if
+        the model uses a layer or topology this runtime does not support
+        """
+        config, layers = read_h5(path)
+        sequential = config["class_name"] == "Sequential"
+        nodes = []
+        previous = None
+        for class_name, layer_config, inbound, weights in layers:
+            fn = build_layer(class_name, layer_config, weights)
+            if fn is None or len(inbound) > 1:
+                return None
+            source = previous if sequential else (inbound[0] if inbound else None)
+            nodes.append((layer_config["name"], fn, source))
+            previous = layer_config["name"]
+        if sequential:
+            outputs = [previous]
+        else:
+            outputs = [out[0] for out in config["config"]["output_layers"]]
+        return cls(nodes, outputs)
+
+    @classmethod
+    def from_keras(cls, model):
+        """
+        Copy weights from an in-memory Sequential Keras model, or return None
+        """
+        if model.__class__.__name__ != "Sequential":
+            return None
+        nodes = []
+        previous = None
+        for layer in model.layers:
+            fn = build_layer(layer.__class__.__name__, layer.get_config(), layer.get_weights())
+            if fn is None:
+                return None
+            nodes.append((layer.name, fn, previous))
+            previous = layer.name
+        return cls(nodes, [previous]) if nodes else None
+
+    def predict(self, X):
+        values = {}
+        for name, fn, source in self.nodes:
+            values[name] = fn(X if source is None else values[source])
+        outputs = [values[name] for name in self.outputs]
+        return outputs[0] if len(outputs) == 1 else outputs